@@ -0,0 +1,261 @@
+# alloc_profiler.py
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+import logging
+
+import cv2
+
+FOCUS_FILES = ('cheat_detection_system.py', 'feedback_engine.py', 'utils.py')
+
+
+def resident_memory_mb() -> float:
+    """Current resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError):
+        # No /proc (macOS, Windows): fall back to the peak, which still catches steady growth
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+class AllocationProfiler:
+    """Samples tracemalloc snapshots while frames are processed and attributes memory growth
+    to source lines.
+
+    Call tick() once per frame. The baseline is taken once warmup_frames have been
+    processed, so model loading and buffers that fill up during the first frames are not
+    counted as growth. After that a snapshot is compared with the baseline every
+    interval seconds.
+    """
+
+    def __init__(self, interval: float = 30.0, warmup_frames: int = 100, focus_files=FOCUS_FILES,
+                 top: int = 10, traceback_depth: int = 1):
+        self.interval = interval
+        self.warmup_frames = warmup_frames
+        self.focus_files = focus_files
+        self.top = top
+        self.traceback_depth = traceback_depth
+        self.logger = logging.getLogger(__name__)
+
+        self.samples = []
+        self.baseline = None
+        self.baseline_rss = None
+        self.baseline_time = None
+        self.baseline_frame = None
+        self.last_sample_time = None
+        self.frame_index = 0
+
+    def start(self) -> 'AllocationProfiler':
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_depth)
+        return self
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        # Leave out tracemalloc's own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def tick(self, frame_index: int = None):
+        """Call once per processed frame"""
+        self.frame_index = frame_index if frame_index is not None else self.frame_index + 1
+        if self.baseline is None:
+            if self.frame_index >= self.warmup_frames:
+                self.baseline = self._snapshot()
+                self.baseline_rss = resident_memory_mb()
+                self.baseline_time = self.last_sample_time = time.perf_counter()
+                self.baseline_frame = self.frame_index
+            return
+        if time.perf_counter() - self.last_sample_time >= self.interval:
+            self.sample()
+
+    def sample(self) -> Dict:
+        """Compare a new snapshot with the baseline and keep the result"""
+        if self.baseline is None:
+            return None
+        now = time.perf_counter()
+        self.last_sample_time = now
+        snapshot = self._snapshot()
+        differences = snapshot.compare_to(self.baseline, 'lineno')
+        traced, _ = tracemalloc.get_traced_memory()
+        rss = resident_memory_mb()
+
+        sample = {
+            'elapsed_s': now - self.baseline_time,
+            'frame': self.frame_index,
+            'rss_mb': rss,
+            'rss_growth_mb': rss - self.baseline_rss,
+            'traced_mb': traced / 1e6,
+            'traced_growth_mb': sum(diff.size_diff for diff in differences) / 1e6,
+            'top_growth': self._growth_lines(differences, None),
+            'focus_growth': self._growth_lines(differences, self.focus_files)
+        }
+        self.samples.append(sample)
+        self.logger.info(f"Frame {self.frame_index}: RSS {sample['rss_mb']:.1f} MB "
+                         f"({sample['rss_growth_mb']:+.1f} MB since baseline)")
+        return sample
+
+    def _growth_lines(self, differences: List[tracemalloc.StatisticDiff], files) -> List[Dict]:
+        lines = []
+        for diff in differences:
+            if diff.size_diff <= 0:
+                continue
+            frame = diff.traceback[0]
+            if files is not None and os.path.basename(frame.filename) not in files:
+                continue
+            lines.append({
+                'location': f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                'growth_kb': diff.size_diff / 1e3,
+                'count_growth': diff.count_diff,
+                'size_kb': diff.size / 1e3
+            })
+            if len(lines) >= self.top:
+                break
+        return lines
+
+    def report(self) -> Dict:
+        """Take a final sample and summarize growth since the baseline"""
+        final = self.sample()
+        frames = self.frame_index - self.baseline_frame if self.baseline is not None else 0
+        return {
+            'warmup_frames': self.warmup_frames,
+            'baseline_taken': self.baseline is not None,
+            'frames_profiled': frames,
+            'duration_s': final['elapsed_s'] if final else 0.0,
+            'rss_growth_mb': final['rss_growth_mb'] if final else 0.0,
+            'traced_growth_mb': final['traced_growth_mb'] if final else 0.0,
+            'traced_growth_per_1000_frames_kb': (final['traced_growth_mb'] * 1e6 / frames if final and frames else 0.0),
+            'focus_growth': final['focus_growth'] if final else [],
+            'top_growth': final['top_growth'] if final else [],
+            'samples': self.samples
+        }
+
+    def write_report(self, path: str) -> Dict:
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def stop(self):
+        tracemalloc.stop()
+
+
+def run_leak_check(video_path: str, exercise_type: str, minutes: float, max_growth_mb: float,
+                   registered_photo: str = None, interval: float = 30.0, warmup_frames: int = 100) -> Dict:
+    """Replay a video in a loop through the headless pipeline for `minutes` and report growth.
+
+    The report's 'passed' is False when resident memory grew by more than max_growth_mb
+    after warm-up, and also when nothing was measured (the video ran out of frames
+    before warm-up ended). Raises IOError if the video can't be read.
+    """
+    cap = cv2.VideoCapture(video_path)
+    readable = cap.isOpened() and cap.read()[0]
+    cap.release()
+    if not readable:
+        raise IOError(f"Could not read video {video_path}")
+
+    from cheat_detection_system import ComprehensiveCheatDetector
+    from exercise_session import ExerciseSession, mp_pose, POSE_SETTINGS
+
+    cheat_detector = ComprehensiveCheatDetector("leak_check", registered_photo)
+    cheat_detector.max_violations = float('inf')  # Keep the full pipeline running
+    profiler = AllocationProfiler(interval=interval, warmup_frames=warmup_frames).start()
+
+    deadline = time.perf_counter() + minutes * 60
+    with mp_pose.Pose(**POSE_SETTINGS) as pose:
+        session = ExerciseSession(exercise_type, pose, cheat_detector, show_score_table=False, verbose=False)
+        while time.perf_counter() < deadline:
+            cap = cv2.VideoCapture(video_path)
+            frames_this_pass = 0
+            while time.perf_counter() < deadline:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                session.process(frame)
+                profiler.tick(session.frame_index)
+                frames_this_pass += 1
+            cap.release()
+            if frames_this_pass == 0:
+                break  # Nothing more to read; don't re-open the file in a busy loop
+        # Sample while the pose model is still loaded, or its release hides any growth
+        report = profiler.report()
+    profiler.stop()
+    report['max_growth_mb'] = max_growth_mb
+    report['passed'] = (report['baseline_taken'] and report['frames_profiled'] > 0 and
+                        report['rss_growth_mb'] <= max_growth_mb)
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-t",
+                    "--exercise_type",
+                    type=str,
+                    help='Type of activity to do',
+                    required=True)
+    ap.add_argument("-vs",
+                    "--video_source",
+                    type=str,
+                    help='Video replayed (looped) through the pipeline',
+                    required=True)
+    ap.add_argument("-m",
+                    "--minutes",
+                    type=float,
+                    default=10.0,
+                    help='How long to replay for')
+    ap.add_argument("-g",
+                    "--max_growth_mb",
+                    type=float,
+                    default=50.0,
+                    help='Fail if resident memory grows by more than this after warm-up')
+    ap.add_argument("-i",
+                    "--interval",
+                    type=float,
+                    default=30.0,
+                    help='Seconds between tracemalloc snapshots')
+    ap.add_argument("-p",
+                    "--registered_photo",
+                    type=str,
+                    help='Registered photo, so the identity check and coach feedback run',
+                    required=False)
+    ap.add_argument("-o",
+                    "--output",
+                    type=str,
+                    help='Write the report as JSON to this path',
+                    required=False)
+    args = vars(ap.parse_args())
+
+    try:
+        report = run_leak_check(args["video_source"], args["exercise_type"], args["minutes"],
+                                args["max_growth_mb"], args["registered_photo"], args["interval"])
+    except IOError as e:
+        print(f"FAIL: {e}")
+        sys.exit(1)
+
+    print(f"RSS growth: {report['rss_growth_mb']:.1f} MB over {report['frames_profiled']} frames "
+          f"(limit {report['max_growth_mb']:.1f} MB)")
+    print(f"Traced growth: {report['traced_growth_mb']:.2f} MB "
+          f"({report['traced_growth_per_1000_frames_kb']:.1f} kB per 1000 frames)")
+    for line in report['focus_growth']:
+        print(f"  {line['location']}: +{line['growth_kb']:.1f} kB ({line['count_growth']:+d} blocks)")
+
+    if args["output"] is not None:
+        with open(args["output"], 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if not report['baseline_taken'] or report['frames_profiled'] == 0:
+        print("FAIL: no frames were profiled after warm-up")
+        sys.exit(1)
+    if not report['passed']:
+        print("FAIL: memory growth exceeds the limit")
+        sys.exit(1)
@@ -0,0 +1,160 @@
+# analysis_cache.py
+import hashlib
+import json
+import os
+import pickle
+from typing import Dict, List
+import logging
+
+import numpy as np
+import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+
+CACHE_VERSION = 1
+
+
+def landmark_list_from_array(landmarks: np.ndarray) -> landmark_pb2.NormalizedLandmarkList:
+    """Rebuild a MediaPipe landmark list (as in results.pose_landmarks) from a (33, 4) array"""
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in landmarks.tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    return landmark_list
+
+
+class CachedPoseResult:
+    """Stand-in for the object returned by Pose.process"""
+    __slots__ = ('pose_landmarks',)
+
+    def __init__(self, pose_landmarks):
+        self.pose_landmarks = pose_landmarks
+
+
+class AnalysisCache:
+    """On-disk cache of per-frame pose landmarks and cheat verdicts for video files.
+
+    Entries are keyed by a hash of the video's content, so renamed or copied files still
+    hit, together with the fingerprint of the configuration that produced them (pose
+    settings, frame size, MediaPipe version, cheat detector settings). Runs of the same
+    video under different configurations each keep their own entry; entries of
+    configurations no longer used simply age out, as the cache is kept under max_bytes
+    by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir: str = ".analysis_cache", max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._hashes = {}  # (path, size, mtime) -> content hash, so a run hashes each file once
+
+    @staticmethod
+    def config_fingerprint(pose_settings: Dict, frame_size, cheat_settings: Dict = None) -> str:
+        """Hash of everything that changes the cached results"""
+        config = {
+            'cache_version': CACHE_VERSION,
+            'mediapipe': mp.__version__,
+            'pose_settings': pose_settings,
+            'frame_size': list(frame_size),
+            'cheat_settings': cheat_settings or {}
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    def video_hash(self, video_path: str) -> str:
+        stat = os.stat(video_path)
+        key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime)
+        if key not in self._hashes:
+            digest = hashlib.sha256()
+            with open(video_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            self._hashes[key] = digest.hexdigest()
+        return self._hashes[key]
+
+    def _entry_path(self, video_path: str, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{self.video_hash(video_path)}-{fingerprint[:16]}.pkl")
+
+    def load(self, video_path: str, fingerprint: str) -> Dict:
+        """Cached analysis of video_path under this configuration, or None on a miss"""
+        path = self._entry_path(video_path, fingerprint)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable cache entry {path}: {str(e)}")
+            os.remove(path)
+            return None
+
+        if entry.get('fingerprint') != fingerprint:
+            return None  # Fingerprint prefix collision; store() will replace the entry
+
+        os.utime(path)  # Mark as recently used
+        return entry
+
+    def store(self, video_path: str, fingerprint: str, landmarks: np.ndarray, verdicts: List[Dict]):
+        """Save per-frame landmarks ((N, 33, 4), NaN where no pose was found) and verdict dicts"""
+        entry = {
+            'fingerprint': fingerprint,
+            'video_hash': self.video_hash(video_path),
+            'landmarks': landmarks.astype(np.float32),
+            'verdicts': verdicts
+        }
+        path = self._entry_path(video_path, fingerprint)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)  # Readers never see a partially written entry
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+            self.logger.info(f"Evicted cache entry {name}")
+
+
+class AnalysisRecorder:
+    """Collects per-frame landmarks and verdicts during a run for AnalysisCache.store"""
+
+    def __init__(self):
+        self.landmarks = []
+        self.verdicts = []
+
+    def record(self, landmarks: np.ndarray, verdict: Dict):
+        self.landmarks.append(landmarks)
+        self.verdicts.append(verdict)
+
+    def landmark_array(self) -> np.ndarray:
+        if not self.landmarks:
+            return np.empty((0, 33, 4), dtype=np.float32)
+        return np.stack(self.landmarks)
+
+
+class AnalysisReplay:
+    """Serves cached per-frame pose results and verdicts by frame number"""
+
+    def __init__(self, entry: Dict):
+        self.landmarks = entry['landmarks']
+        self.verdicts = entry['verdicts']
+
+    def __len__(self):
+        return len(self.verdicts)
+
+    def pose_result(self, index: int) -> CachedPoseResult:
+        landmarks = self.landmarks[index]
+        if np.isnan(landmarks[0, 0]):
+            return CachedPoseResult(None)
+        return CachedPoseResult(landmark_list_from_array(landmarks))
+
+    def verdict(self, index: int) -> Dict:
+        return self.verdicts[index]
@@ -0,0 +1,181 @@
+# bulk_enrollment.py
+import argparse
+import csv
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+import logging
+
+import numpy as np
+import face_recognition
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+DEFAULT_STORE_PATH = "user_encodings/encodings.pkl"
+
+
+def collect_enrollment_pairs(source: str) -> List[Tuple[str, str]]:
+    """Read (user_id, photo_path) pairs from a CSV file or a directory.
+
+    CSV rows are ``user_id,photo_path`` (a header row is allowed); relative photo
+    paths are resolved against the CSV's directory. In a directory, either each
+    photo is named ``<user_id>.<ext>`` or each user has a ``<user_id>/`` folder
+    whose first photo is used.
+    """
+    pairs = []
+    if os.path.isfile(source):
+        base_dir = os.path.dirname(os.path.abspath(source))
+        with open(source, newline='') as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or row[0].strip().lower() == 'user_id':
+                    continue
+                user_id, photo = row[0].strip(), row[1].strip()
+                pairs.append((user_id, photo if os.path.isabs(photo) else os.path.join(base_dir, photo)))
+        return pairs
+
+    for entry in sorted(os.listdir(source)):
+        path = os.path.join(source, entry)
+        if os.path.isdir(path):
+            photos = sorted(p for p in os.listdir(path) if p.lower().endswith(IMAGE_EXTENSIONS))
+            if photos:
+                pairs.append((entry, os.path.join(path, photos[0])))
+        elif entry.lower().endswith(IMAGE_EXTENSIONS):
+            pairs.append((os.path.splitext(entry)[0], path))
+    return pairs
+
+
+def encode_photo(pair: Tuple[str, str]) -> Dict:
+    """Worker: encode one user's photo, reporting photos without exactly one face"""
+    user_id, photo_path = pair
+    result = {'user_id': user_id, 'photo': photo_path, 'encoding': None, 'error': None}
+    try:
+        image = face_recognition.load_image_file(photo_path)
+        locations = face_recognition.face_locations(image)
+        if len(locations) == 0:
+            result['error'] = "No face found"
+        elif len(locations) > 1:
+            result['error'] = f"{len(locations)} faces found"
+        else:
+            result['encoding'] = face_recognition.face_encodings(image, locations)[0]
+    except Exception as e:
+        result['error'] = f"Could not read photo: {str(e)}"
+    return result
+
+
+def find_duplicates(user_ids: List[str], encodings: np.ndarray, threshold: float,
+                    block_size: int = 256) -> Dict[int, int]:
+    """Map index -> earlier index of a different user whose encoding is within threshold.
+
+    Distances are computed block_size rows at a time against the earlier rows only, so
+    memory stays at block_size x N instead of a full N x N matrix.
+    """
+    duplicates = {}
+    if len(encodings) < 2:
+        return duplicates
+
+    encodings = np.asarray(encodings, dtype=np.float64)
+    squared = np.sum(encodings ** 2, axis=1)
+    for start in range(1, len(encodings), block_size):
+        stop = min(start + block_size, len(encodings))
+        # |a-b|^2 = |a|^2 + |b|^2 - 2ab against rows 0..stop-1; row i only looks at columns < i
+        block = encodings[start:stop]
+        squared_distances = squared[start:stop, None] + squared[None, :stop] - 2 * block @ encodings[:stop].T
+        close_pairs = squared_distances <= threshold ** 2
+
+        for i in range(start, stop):
+            close = np.nonzero(close_pairs[i - start, :i])[0]
+            for j in close:
+                # Keep the first enrolled user; later near-identical faces are rejected
+                if j not in duplicates and user_ids[j] != user_ids[i]:
+                    duplicates[i] = int(j)
+                    break
+    return duplicates
+
+
+def bulk_enroll(pairs: List[Tuple[str, str]], store_path: str = DEFAULT_STORE_PATH,
+                workers: int = None, duplicate_threshold: float = 0.35) -> Dict:
+    """Encode all photos in parallel and write a single consolidated encoding store"""
+    logger = logging.getLogger(__name__)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(encode_photo, pairs, chunksize=8))
+
+    rejected = [{'user_id': r['user_id'], 'photo': r['photo'], 'reason': r['error']}
+                for r in results if r['error']]
+    accepted = [r for r in results if not r['error']]
+
+    user_ids = [r['user_id'] for r in accepted]
+    if accepted:
+        encodings = np.array([r['encoding'] for r in accepted])
+        duplicates = find_duplicates(user_ids, encodings, duplicate_threshold)
+    else:
+        encodings = np.empty((0, 128))
+        duplicates = {}
+    for i, j in duplicates.items():
+        rejected.append({'user_id': user_ids[i], 'photo': accepted[i]['photo'],
+                         'reason': f"Near-identical to user {user_ids[j]}"})
+
+    keep = [i for i in range(len(accepted)) if i not in duplicates]
+    store = {
+        'user_ids': [user_ids[i] for i in keep],
+        'encodings': encodings[keep] if keep else np.empty((0, 128))
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    with open(store_path, 'wb') as f:
+        pickle.dump(store, f)
+
+    logger.info(f"Enrolled {len(keep)} of {len(pairs)} users into {store_path}")
+    return {
+        'total': len(pairs),
+        'enrolled': len(keep),
+        'rejected': rejected
+    }
+
+
+def load_encoding_store(store_path: str = DEFAULT_STORE_PATH) -> Dict[str, np.ndarray]:
+    """Read a consolidated store as {user_id: encoding}"""
+    with open(store_path, 'rb') as f:
+        store = pickle.load(f)
+    return dict(zip(store['user_ids'], store['encodings']))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-i",
+                    "--input",
+                    type=str,
+                    help='Directory of photos or CSV of user_id,photo_path rows',
+                    required=True)
+    ap.add_argument("-o",
+                    "--output",
+                    type=str,
+                    default=DEFAULT_STORE_PATH,
+                    help='Consolidated encoding store to write')
+    ap.add_argument("-w",
+                    "--workers",
+                    type=int,
+                    help='Number of encoding processes (default: CPU count)')
+    ap.add_argument("-d",
+                    "--duplicate_threshold",
+                    type=float,
+                    default=0.35,
+                    help='Face distance below which two users are treated as the same face')
+    ap.add_argument("-r",
+                    "--report",
+                    type=str,
+                    help='Write the rejection report as JSON to this path')
+    args = vars(ap.parse_args())
+
+    report = bulk_enroll(collect_enrollment_pairs(args["input"]), args["output"],
+                         args["workers"], args["duplicate_threshold"])
+
+    print(f"Enrolled {report['enrolled']}/{report['total']} users")
+    for rejection in report['rejected']:
+        print(f"  rejected {rejection['user_id']} ({rejection['photo']}): {rejection['reason']}")
+
+    if args["report"] is not None:
+        with open(args["report"], 'w') as f:
+            json.dump(report, f, indent=2)
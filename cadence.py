@@ -0,0 +1,157 @@
+# cadence.py
+import time
+from typing import Dict
+
+import numpy as np
+
+from utils import detection_body_part
+
+
+class CadenceEstimator:
+    """Streaming step counter and cadence estimate for walking and running.
+
+    Each frame adds one sample of the left-right leg separation (mean of the knee and
+    ankle x offsets) to a fixed-size ring buffer. The separation swings through one full
+    period per stride (left step + right step), so the stride time is the lag of the
+    first autocorrelation peak. The autocorrelation sums for every lag are updated
+    incrementally, which keeps the per-frame cost constant.
+
+    Steps are counted when the separation crosses a hysteresis band around zero, so
+    noisy knee crossings don't double count.
+    """
+
+    def __init__(self, window: int = 150, max_lag: int = 75, min_stride_time: float = 0.4,
+                 hysteresis: float = 0.5, min_peak: float = 0.3):
+        self.window = window  # samples kept (~5s at 30fps)
+        self.max_lag = max_lag  # longest stride detectable, in samples (~2.5s at 30fps)
+        self.min_stride_time = min_stride_time  # seconds; shorter lags are ignored
+        self.hysteresis = hysteresis  # band half-width, as a fraction of the RMS swing
+        self.min_peak = min_peak  # normalized autocorrelation needed to trust a period
+
+        self.raw = np.zeros(window)  # separation as measured
+        self.raw_sum = 0.0
+        self.values = np.zeros(window)  # separation minus the window mean at insertion time
+        self.timestamps = np.zeros(window)
+        self.lag_sums = np.zeros(max_lag + 1)  # sum over the window of x[t] * x[t - k]
+        self.count = 0  # samples seen so far
+        self.smoothed = 0.0  # lightly low-passed sample used for step counting
+
+        self.steps = 0
+        self.side = 0  # +1 left leg ahead, -1 right leg ahead, 0 unknown
+        self.stride_time = None
+        self.step_frequency = None  # steps per second
+
+    def update(self, landmarks, timestamp: float = None) -> 'CadenceEstimator':
+        """Add one frame of pose landmarks"""
+        left_knee = detection_body_part(landmarks, "LEFT_KNEE")
+        right_knee = detection_body_part(landmarks, "RIGHT_KNEE")
+        left_ankle = detection_body_part(landmarks, "LEFT_ANKLE")
+        right_ankle = detection_body_part(landmarks, "RIGHT_ANKLE")
+        separation = ((left_knee[0] - right_knee[0]) + (left_ankle[0] - right_ankle[0])) / 2
+        return self.update_separation(separation, timestamp)
+
+    def update_separation(self, separation: float, timestamp: float = None) -> 'CadenceEstimator':
+        """Add one sample of the leg separation signal"""
+        if timestamp is None:
+            timestamp = time.time()
+
+        n = self.window
+        head = self.count % n
+
+        # Remove the offset (camera angle, body position in frame) with the window mean
+        if self.count >= n:
+            self.raw_sum -= self.raw[head]
+        self.raw[head] = separation
+        self.raw_sum += separation
+        value = separation - self.raw_sum / min(self.count + 1, n)
+
+        lags = min(self.max_lag, self.count, n - 1)
+        if self.count >= n:
+            # The oldest sample leaves the window together with every product it is part of
+            oldest = self.values[head]
+            newer = self.values[(head + np.arange(self.max_lag + 1)) % n]
+            self.lag_sums -= oldest * newer
+        self.values[head] = value
+        self.timestamps[head] = timestamp
+        older = self.values[(head - np.arange(lags + 1)) % n]
+        self.lag_sums[:lags + 1] += value * older
+        self.count += 1
+
+        # Re-sum from the buffer once per window to stop floating-point drift
+        if self.count % n == 0:
+            self._recompute_lag_sums()
+
+        self.smoothed += 0.4 * (value - self.smoothed)
+        self._count_steps(self.smoothed)
+        self._estimate_stride()
+        return self
+
+    def _recompute_lag_sums(self):
+        self.raw_sum = float(np.sum(self.raw))
+        self.values[:] = self.raw - self.raw_sum / self.window
+        ordered = np.roll(self.values, -(self.count % self.window))
+        for lag in range(self.max_lag + 1):
+            self.lag_sums[lag] = np.dot(ordered[lag:], ordered[:len(ordered) - lag])
+
+    def _count_steps(self, value: float):
+        samples = min(self.count, self.window)
+        if samples < 2:
+            return
+        band = self.hysteresis * np.sqrt(self.lag_sums[0] / samples)
+        if value > band and self.side != 1:
+            if self.side == -1:
+                self.steps += 1
+            self.side = 1
+        elif value < -band and self.side != -1:
+            if self.side == 1:
+                self.steps += 1
+            self.side = -1
+
+    def _estimate_stride(self):
+        samples = min(self.count, self.window)
+        # Only lags up to half the buffered samples have enough products to be reliable
+        max_lag = min(self.max_lag, samples // 2)
+        if max_lag < 4 or self.lag_sums[0] <= 0:
+            return
+        newest = (self.count - 1) % self.window
+        oldest = (self.count - samples) % self.window
+        frame_time = (self.timestamps[newest] - self.timestamps[oldest]) / (samples - 1)
+        if frame_time <= 0:
+            return
+
+        # Normalize each lag by its number of products so long lags aren't penalized
+        products = samples - np.arange(max_lag + 1)
+        correlation = (self.lag_sums[:max_lag + 1] / products) / (self.lag_sums[0] / samples)
+
+        min_lag = max(2, int(self.min_stride_time / frame_time))
+        if min_lag >= max_lag:
+            return
+        # The first peak after the correlation has dipped below zero is one full stride
+        below = np.nonzero(correlation[min_lag // 2:] < 0)[0]
+        if len(below) == 0:
+            return
+        start = max(min_lag, min_lag // 2 + below[0])
+        if start >= max_lag:
+            return
+        # Later peaks at multiples of the stride are as high as the first one, so take the
+        # first local maximum rather than the global one
+        middle = correlation[start:max_lag]
+        before = correlation[start - 1:max_lag - 1]
+        after = correlation[start + 1:max_lag + 1]
+        peaks = np.nonzero((middle >= before) & (middle >= after) & (middle >= self.min_peak))[0]
+        if len(peaks) == 0:
+            return
+        lag = start + int(peaks[0])
+
+        self.stride_time = lag * frame_time
+        self.step_frequency = 2.0 / self.stride_time
+
+    def aux_metrics(self) -> Dict:
+        """Metrics for FeedbackAnalyzer.analyze_rep_performance (empty until a stride is found)"""
+        if self.stride_time is None:
+            return {}
+        return {
+            'stride_time': self.stride_time,
+            'step_frequency': self.step_frequency,
+            'cadence': self.step_frequency * 60  # steps per minute
+        }
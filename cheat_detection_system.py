@@ -3,15 +3,151 @@ import cv2
 import numpy as np
 import face_recognition
 import pickle
+import hashlib
 import time
 from datetime import datetime
 import json
 import os
+from collections import deque
 from typing import Tuple, Dict, List
 import logging
 
+from frame_tracer import tracer
+
+# Overlay colors (BGR)
+GREEN = (0, 255, 0)
+YELLOW = (0, 255, 255)
+ORANGE = (0, 165, 255)
+RED = (0, 0, 255)
+
+_NO_VIOLATIONS = ()
+
+
+def _format(template: str, value) -> str:
+    return template if value is None else template.format(value)
+
+
+class CheatVerdict:
+    """Per-frame detection result; violation and status text is only formatted when read.
+
+    The detector reuses one instance across frames, so a verdict is only valid until the
+    next process_frame call; use copy() or to_dict() to keep it. Item access
+    (verdict['violations']) mirrors the dict returned by earlier versions.
+    """
+    __slots__ = ('session_active', 'face_verified', 'confidence', 'overlay_color',
+                 '_violations', '_warnings', '_message', '_message_value')
+
+    KEYS = ('session_active', 'violations', 'warnings', 'face_verified', 'confidence', 'message', 'overlay_color')
+
+    def __init__(self):
+        self._violations = []
+        self._warnings = []
+        self.reset()
+
+    def reset(self):
+        self.session_active = True
+        self.face_verified = False
+        self.confidence = 0.0
+        self.overlay_color = GREEN
+        self._violations.clear()
+        self._warnings.clear()
+        self._message = "Monitoring..."
+        self._message_value = None
+
+    def add_violation(self, template: str, value=None):
+        self._violations.append((template, value))
+
+    def add_warning(self, warning: str):
+        self._warnings.append(warning)
+
+    def set_message(self, template: str, value=None):
+        self._message = template
+        self._message_value = value
+
+    @property
+    def has_issues(self) -> bool:
+        return bool(self._violations or self._warnings)
+
+    @property
+    def violations(self) -> List[str]:
+        return [_format(template, value) for template, value in self._violations]
+
+    @property
+    def warnings(self) -> List[str]:
+        return list(self._warnings)
+
+    @property
+    def message(self) -> str:
+        return _format(self._message, self._message_value)
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def keys(self):
+        return self.KEYS
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def copy(self) -> 'CheatVerdict':
+        verdict = CheatVerdict()
+        verdict.session_active = self.session_active
+        verdict.face_verified = self.face_verified
+        verdict.confidence = self.confidence
+        verdict.overlay_color = self.overlay_color
+        verdict._violations.extend(self._violations)
+        verdict._warnings.extend(self._warnings)
+        verdict._message = self._message
+        verdict._message_value = self._message_value
+        return verdict
+
+    @classmethod
+    def from_dict(cls, values: Dict) -> 'CheatVerdict':
+        """Rebuild a verdict from to_dict() output (e.g. one loaded from the analysis cache)"""
+        verdict = cls()
+        verdict.session_active = values['session_active']
+        verdict.face_verified = values['face_verified']
+        verdict.confidence = values['confidence']
+        verdict.overlay_color = tuple(values['overlay_color'])
+        for violation in values['violations']:
+            verdict.add_violation(violation)
+        for warning in values['warnings']:
+            verdict.add_warning(warning)
+        verdict.set_message(values['message'])
+        return verdict
+
+
+class FrameLogEntry:
+    """Audit-trail record of one frame; the timestamp and violations are formatted on demand"""
+    __slots__ = ('timestamp', 'user_id', 'face_verified', 'confidence', 'violations', 'total_violations')
+
+    def __init__(self, timestamp: float, user_id: str, face_verified: bool, confidence: float,
+                 violations: tuple, total_violations: int):
+        self.timestamp = timestamp
+        self.user_id = user_id
+        self.face_verified = face_verified
+        self.confidence = confidence
+        self.violations = violations  # (template, value) pairs
+        self.total_violations = total_violations
+
+    def to_dict(self) -> Dict:
+        return {
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat(),
+            'user_id': self.user_id,
+            'face_verified': self.face_verified,
+            'confidence': self.confidence,
+            'violations': [_format(template, value) for template, value in self.violations],
+            'total_violations': self.total_violations
+        }
+
+
 class ComprehensiveCheatDetector:
-    def __init__(self, user_id: str, registered_photo_path: str = None):
+    def __init__(self, user_id: str, registered_photo_path: str = None, encoding_store_path: str = None):
         self.user_id = user_id
         self.registered_encoding = None
         self.session_log = []
@@ -29,6 +165,20 @@ class ComprehensiveCheatDetector:
         self.max_violations = 3
         self.max_no_face_frames = 90  # 3 second at 30fps
         
+        # Replay detection sampling
+        self.replay_sample_interval = 3  # Evaluate every 3rd frame
+        self.replay_window = deque(maxlen=10)  # ~1 second of samples at 30fps
+        self.replay_frame_index = 0
+        self.last_replay_result = (False, 0.0)
+        
+        # Two-tier face detection: Haar cascade on a downscaled frame every frame,
+        # face_recognition whenever Haar disagrees with the last confirmed face count
+        self.two_tier_face_detection = True
+        self.face_detection_scale = 0.5
+        self.face_confirm_interval = 30  # Re-confirm at least every 30 frames even if Haar agrees
+        self.confirmed_face_count = None
+        self.frames_since_face_confirm = 0
+        
         # Violation tracking
         self.violation_counts = {
             'wrong_person': 0,
@@ -38,6 +188,14 @@ class ComprehensiveCheatDetector:
             'poor_lighting': 0
         }
         
+        # Per-frame results are written into one reused verdict
+        self._verdict = CheatVerdict()
+        self._blocked_verdict = CheatVerdict()
+        self._blocked_verdict.session_active = False
+        self._blocked_verdict.add_violation("Session terminated due to multiple violations")
+        self._blocked_verdict.set_message("Assessment blocked - Contact administrator")
+        self._blocked_verdict.overlay_color = RED
+        
         # Session state
         self.session_active = True
         self.last_face_detection = time.time()
@@ -46,6 +204,8 @@ class ComprehensiveCheatDetector:
         # Load registered face if provided
         if registered_photo_path and os.path.exists(registered_photo_path):
             self.load_registered_face(registered_photo_path)
+        elif encoding_store_path and os.path.exists(encoding_store_path):
+            self.load_encoding_from_store(encoding_store_path)
         
         
     def load_registered_face(self, photo_path: str) -> bool:
@@ -78,6 +238,24 @@ class ComprehensiveCheatDetector:
             self.logger.error(f"Error loading registered face: {str(e)}")
             return False
     
+    def load_encoding_from_store(self, store_path: str) -> bool:
+        """Load the user's encoding from a consolidated bulk-enrollment store"""
+        try:
+            with open(store_path, 'rb') as f:
+                store = pickle.load(f)
+            
+            if self.user_id not in store['user_ids']:
+                self.logger.error(f"User {self.user_id} not found in encoding store {store_path}")
+                return False
+            
+            self.registered_encoding = store['encodings'][store['user_ids'].index(self.user_id)]
+            self.logger.info(f"Loaded registered face for user {self.user_id} from {store_path}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error loading encoding store: {str(e)}")
+            return False
+    
     def detect_faces_in_frame(self, frame: np.ndarray) -> List[Dict]:
         """Detect all faces in the current frame"""
         faces = []
@@ -99,6 +277,51 @@ class ComprehensiveCheatDetector:
         
         return faces
     
+    def detect_faces_two_tier(self, frame: np.ndarray) -> List[Dict]:
+        """Count faces with the Haar cascade, encode with face_recognition only where needed.
+
+        Haar boxes are only used while their count agrees with the last count confirmed by
+        face_recognition; otherwise (a poster, a turned face) the accurate detector decides,
+        so the no-face and multiple-face checks never act on an unconfirmed Haar count.
+        """
+        scale = self.face_detection_scale
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        boxes = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+        
+        self.frames_since_face_confirm += 1
+        if (len(boxes) != self.confirmed_face_count or
+                self.frames_since_face_confirm >= self.face_confirm_interval):
+            with tracer.span("face_recognition_confirm", haar_faces=len(boxes)):
+                faces = self.detect_faces_in_frame(frame)
+            self.confirmed_face_count = len(faces)
+            self.frames_since_face_confirm = 0
+            return faces
+        
+        # Map Haar boxes back to full-frame (top, right, bottom, left) locations
+        face_locations = [
+            (int(y / scale), int((x + w) / scale), int((y + h) / scale), int(x / scale))
+            for (x, y, w, h) in boxes
+        ]
+        
+        # Only a single face needs an encoding (identity check); zero or multiple faces are
+        # decided by the count alone
+        if len(face_locations) == 1:
+            face_encodings = face_recognition.face_encodings(frame, face_locations)
+        else:
+            face_encodings = [None] * len(face_locations)
+        
+        faces = []
+        for (top, right, bottom, left), encoding in zip(face_locations, face_encodings):
+            faces.append({
+                'location': (top, right, bottom, left),
+                'encoding': encoding,
+                'center': ((left + right) // 2, (top + bottom) // 2),
+                'size': (right - left) * (bottom - top)
+            })
+        
+        return faces
+    
     def verify_identity(self, current_face_encoding: np.ndarray) -> Tuple[bool, float]:
         """Verify if the current face matches the registered user"""
         if self.registered_encoding is None:
@@ -113,6 +336,16 @@ class ComprehensiveCheatDetector:
     
     def detect_replay_attack(self, frame: np.ndarray) -> Tuple[bool, float]:
         """Detect if the video is a replay/screen recording"""
+        replay_indicators = self._reference_replay_indicators(frame)
+        
+        # Calculate confidence based on indicators
+        confidence = sum(replay_indicators) / len(replay_indicators)
+        is_replay = confidence > 0.6  # 60% or more indicators triggered
+        
+        return is_replay, confidence
+    
+    def _reference_replay_indicators(self, frame: np.ndarray) -> List[bool]:
+        """Replay indicators of detect_replay_attack, straightforward full-spectrum version"""
         # Convert to different color spaces for analysis
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
@@ -150,11 +383,77 @@ class ComprehensiveCheatDetector:
         high_freq_energy = np.sum(magnitude[magnitude.shape[0]//4:, :]) / np.sum(magnitude)
         replay_indicators.append(high_freq_energy > 0.3)
         
-        # Calculate confidence based on indicators
-        confidence = sum(replay_indicators) / len(replay_indicators)
-        is_replay = confidence > 0.6  # 60% or more indicators triggered
+        return replay_indicators
+    
+    def detect_replay_attack_fast(self, frame: np.ndarray) -> Tuple[bool, float]:
+        """Sampled replay detection aggregated over a sliding window of frames"""
+        sample = self.replay_frame_index % self.replay_sample_interval == 0
+        self.replay_frame_index += 1
+        if not sample:
+            return self.last_replay_result
+        
+        indicators = self._replay_indicators(frame)
+        self.replay_window.append(sum(indicators) / len(indicators))
+        
+        # Average the per-sample confidences so a single noisy frame can't flip the verdict
+        confidence = sum(self.replay_window) / len(self.replay_window)
+        self.last_replay_result = (confidence > 0.6, confidence)
+        return self.last_replay_result
+    
+    def _replay_indicators(self, frame: np.ndarray) -> List[bool]:
+        """Same indicators as _reference_replay_indicators, on the full-size frame.
+
+        Downscaling smooths away the edges the edge-density, rectangle and moiré checks
+        look for, so all indicators see the full frame; the savings come from sampling
+        and from cheaper reductions and FFT.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        return is_replay, confidence
+        replay_indicators = []
+        
+        # 1. Screen reflection detection
+        bright_pixels = np.count_nonzero(gray > 240) / gray.size
+        replay_indicators.append(bright_pixels > 0.15)
+        
+        # 2. Edge sharpness (on the 0-255 scale of the reference check)
+        edges = cv2.Canny(gray, 50, 150)
+        edge_density = np.count_nonzero(edges) * 255 / edges.size
+        replay_indicators.append(edge_density > 0.08)
+        
+        # 3. Color temperature analysis
+        b, g, r = cv2.mean(frame)[:3]
+        blue_dominance = b / (r + g + b + 1e-6)
+        replay_indicators.append(blue_dominance > 0.4)
+        
+        # 4. Rectangular region detection (screen borders)
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        large_rectangles = 0
+        for contour in contours:
+            if cv2.contourArea(contour) > 10000:
+                epsilon = 0.02 * cv2.arcLength(contour, True)
+                approx = cv2.approxPolyDP(contour, epsilon, True)
+                if len(approx) == 4:
+                    large_rectangles += 1
+        replay_indicators.append(large_rectangles > 2)
+        
+        # 5. Moiré pattern detection
+        replay_indicators.append(self._high_frequency_energy(gray) > 0.3)
+        
+        return replay_indicators
+    
+    @staticmethod
+    def _high_frequency_energy(gray: np.ndarray) -> float:
+        """Moiré score of detect_replay_attack, computed from the half spectrum of a real FFT"""
+        height, width = gray.shape
+        magnitude = np.abs(np.fft.rfft2(gray))
+        
+        # The full spectrum is conjugate-symmetric: |F[u, v]| == |F[-u, -v]|, so the
+        # columns dropped by rfft2 are the kept columns with their rows mirrored.
+        start = height // 4
+        mirrored = slice(1, (width + 1) // 2)
+        high = magnitude[start:, :].sum() + magnitude[1:height - start + 1, mirrored].sum()
+        total = magnitude.sum() + magnitude[:, mirrored].sum()
+        return high / (total + 1e-6)
     
     def analyze_lighting_quality(self, frame: np.ndarray) -> Tuple[bool, str]:
         """Analyze if lighting is adequate for face recognition"""
@@ -173,50 +472,49 @@ class ComprehensiveCheatDetector:
         else:
             return True, "Good lighting conditions"
     
-    def process_frame(self, frame: np.ndarray) -> Dict:
+    def process_frame(self, frame: np.ndarray) -> CheatVerdict:
         """Main processing function for each frame"""
         if not self.session_active:
             return self._get_blocked_response()
         
-        results = {
-            'session_active': True,
-            'violations': [],
-            'warnings': [],
-            'face_verified': False,
-            'confidence': 0.0,
-            'message': "Monitoring...",
-            'overlay_color': (0, 255, 0)  # Green by default
-        }
+        results = self._verdict
+        results.reset()
         
         # 1. Check lighting quality
-        good_lighting, lighting_msg = self.analyze_lighting_quality(frame)
+        with tracer.span("lighting"):
+            good_lighting, lighting_msg = self.analyze_lighting_quality(frame)
         if not good_lighting:
-            results['warnings'].append(lighting_msg)
-            results['overlay_color'] = (0, 255, 255)  # Yellow
+            results.add_warning(lighting_msg)
+            results.overlay_color = YELLOW
         
         # 2. Detect replay attacks
-        is_replay, replay_confidence = self.detect_replay_attack(frame)
+        with tracer.span("replay_detection"):
+            is_replay, replay_confidence = self.detect_replay_attack_fast(frame)
         if is_replay:
             self.violation_counts['replay_detected'] += 1
-            results['violations'].append(f"Video replay detected (confidence: {replay_confidence:.2f})")
-            results['overlay_color'] = (0, 0, 255)  # Red
+            results.add_violation("Video replay detected (confidence: {:.2f})", replay_confidence)
+            results.overlay_color = RED
         
         # 3. Detect faces
-        faces = self.detect_faces_in_frame(frame)
+        with tracer.span("face_detection"):
+            if self.two_tier_face_detection:
+                faces = self.detect_faces_two_tier(frame)
+            else:
+                faces = self.detect_faces_in_frame(frame)
         
         if len(faces) == 0:
             self.no_face_frame_count += 1
             if self.no_face_frame_count > self.max_no_face_frames:
                 self.violation_counts['no_face_detected'] += 1
-                results['violations'].append("No face detected for extended period")
-                results['message'] = "Please ensure your face is clearly visible"
-                results['overlay_color'] = (0, 165, 255)  # Orange
+                results.add_violation("No face detected for extended period")
+                results.set_message("Please ensure your face is clearly visible")
+                results.overlay_color = ORANGE
         
         elif len(faces) > 1:
             self.violation_counts['multiple_faces'] += 1
-            results['violations'].append("Multiple faces detected")
-            results['message'] = "Only one person should be visible"
-            results['overlay_color'] = (0, 0, 255)  # Red
+            results.add_violation("Multiple faces detected")
+            results.set_message("Only one person should be visible")
+            results.overlay_color = RED
         
         else:
             # Single face detected - verify identity
@@ -225,22 +523,23 @@ class ComprehensiveCheatDetector:
             
             # Draw face rectangle
             top, right, bottom, left = face['location']
-            cv2.rectangle(frame, (left, top), (right, bottom), results['overlay_color'], 2)
+            cv2.rectangle(frame, (left, top), (right, bottom), results.overlay_color, 2)
             
             # Verify identity
             if self.registered_encoding is not None:
-                is_match, confidence = self.verify_identity(face['encoding'])
-                results['face_verified'] = is_match
-                results['confidence'] = confidence
+                with tracer.span("identity"):
+                    is_match, confidence = self.verify_identity(face['encoding'])
+                results.face_verified = is_match
+                results.confidence = confidence
                 
                 if is_match:
-                    results['message'] = f"Identity verified ({confidence:.2f})"
+                    results.set_message("Identity verified ({:.2f})", confidence)
                     self.last_face_detection = time.time()
                 else:
                     self.violation_counts['wrong_person'] += 1
-                    results['violations'].append(f"Identity mismatch (confidence: {confidence:.2f})")
-                    results['message'] = "Unrecognized person detected"
-                    results['overlay_color'] = (0, 0, 255)  # Red
+                    results.add_violation("Identity mismatch (confidence: {:.2f})", confidence)
+                    results.set_message("Unrecognized person detected")
+                    results.overlay_color = RED
         
         # Check if maximum violations exceeded
         total_violations = sum(self.violation_counts.values())
@@ -253,28 +552,45 @@ class ComprehensiveCheatDetector:
         
         return results
     
-    def _get_blocked_response(self) -> Dict:
-        """Return response when session is blocked"""
+    def apply_cached_verdict(self, verdict: CheatVerdict, violation_counts: Dict = None):
+        """Account for a verdict replayed from the analysis cache in place of process_frame"""
+        if violation_counts is not None:
+            self.violation_counts.update(violation_counts)
+        if not verdict.session_active:
+            self.session_active = False
+        self._log_frame_analysis(verdict)
+    
+    def analysis_settings(self) -> Dict:
+        """Everything that changes this detector's verdicts, for the analysis cache fingerprint"""
+        encoding = self.registered_encoding
         return {
-            'session_active': False,
-            'violations': ["Session terminated due to multiple violations"],
-            'warnings': [],
-            'face_verified': False,
-            'confidence': 0.0,
-            'message': "Assessment blocked - Contact administrator",
-            'overlay_color': (0, 0, 255)
+            'user_id': self.user_id,
+            'registered_encoding': None if encoding is None else hashlib.sha256(
+                np.asarray(encoding, dtype=np.float64).tobytes()).hexdigest(),
+            'face_match_threshold': self.face_match_threshold,
+            'replay_confidence_threshold': self.replay_confidence_threshold,
+            'max_violations': self.max_violations,
+            'max_no_face_frames': self.max_no_face_frames,
+            'replay_sample_interval': self.replay_sample_interval,
+            'two_tier_face_detection': self.two_tier_face_detection,
+            'face_detection_scale': self.face_detection_scale,
+            'face_confirm_interval': self.face_confirm_interval
         }
     
-    def _log_frame_analysis(self, results: Dict):
+    def _get_blocked_response(self) -> CheatVerdict:
+        """Return response when session is blocked"""
+        return self._blocked_verdict
+    
+    def _log_frame_analysis(self, results: CheatVerdict):
         """Log frame analysis for audit trail"""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'user_id': self.user_id,
-            'face_verified': results['face_verified'],
-            'confidence': results['confidence'],
-            'violations': results['violations'],
-            'total_violations': sum(self.violation_counts.values())
-        }
+        log_entry = FrameLogEntry(
+            time.time(),
+            self.user_id,
+            results.face_verified,
+            results.confidence,
+            tuple(results._violations) if results._violations else _NO_VIOLATIONS,
+            sum(self.violation_counts.values())
+        )
         self.session_log.append(log_entry)
     
     def get_session_report(self) -> Dict:
@@ -285,5 +601,5 @@ class ComprehensiveCheatDetector:
             'total_violations': sum(self.violation_counts.values()),
             'violation_breakdown': self.violation_counts.copy(),
             'session_valid': self.session_active and sum(self.violation_counts.values()) < self.max_violations,
-            'log_entries': self.session_log[-10:]  # Last 10 entries
+            'log_entries': [entry.to_dict() for entry in self.session_log[-10:]]  # Last 10 entries
         }
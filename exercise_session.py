@@ -0,0 +1,248 @@
+# exercise_session.py
+import time
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from utils import *
+from body_part_angle import BodyPartAngle
+from types_of_exercise import TypeOfExercise, RepState
+from feedback_engine import FeedbackAnalyzer
+from cheat_messages import EnhancedCheatMessages
+from cadence import CadenceEstimator
+from cheat_detection_system import CheatVerdict
+from frame_tracer import tracer
+
+mp_drawing = mp.solutions.drawing_utils
+mp_pose = mp.solutions.pose
+
+FRAME_SIZE = (800, 480)
+POSE_SETTINGS = {'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+LANDMARK_STYLE = mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2, circle_radius=2)
+CONNECTION_STYLE = mp_drawing.DrawingSpec(color=(174, 139, 45), thickness=2, circle_radius=2)
+
+
+def rep_angle(landmarks, exercise_type):
+    """Select the relevant rep angle for each exercise"""
+    if exercise_type == "sit-up":
+        return BodyPartAngle(landmarks).angle_of_the_abdomen()
+    elif exercise_type == "push-up":
+        return BodyPartAngle(landmarks).angle_of_the_left_arm()
+    elif exercise_type == "pull-up":
+        return BodyPartAngle(landmarks).angle_of_the_left_arm()  # or right arm if preferred
+    elif exercise_type == "squat":
+        return BodyPartAngle(landmarks).angle_of_the_left_leg()
+    elif exercise_type == "vertical jump":
+        return BodyPartAngle(landmarks).angle_of_the_left_leg()
+    elif exercise_type == "run":
+        return BodyPartAngle(landmarks).angle_of_the_left_leg()  # Ideally stride info; adjust as needed
+    else:
+        return BodyPartAngle(landmarks).angle_of_the_abdomen()
+
+
+class ExerciseSession:
+    """The per-frame pipeline of main.py: pose, rep counting, cheat detection and feedback"""
+
+    def __init__(self, exercise_type, pose, cheat_detector, message_handler=None,
+                 session_store=None, session_id=None, motion_gate=None,
+                 show_score_table=True, verbose=True, analysis_replay=None, analysis_recorder=None):
+        self.exercise_type = exercise_type
+        self.pose = pose
+        self.cheat_detector = cheat_detector
+        self.message_handler = message_handler or EnhancedCheatMessages()
+        self.analyzer = FeedbackAnalyzer(exercise_type)
+        self.session_store = session_store
+        self.session_id = session_id
+        self.motion_gate = motion_gate
+        self.show_score_table = show_score_table
+        self.verbose = verbose
+        # Cached pose results and verdicts to use instead of inference (AnalysisReplay),
+        # or a recorder that collects them for the analysis cache (AnalysisRecorder).
+        # Frames skipped by the motion gate have no analysis of their own, so a gated
+        # run can replay the cache but not record one.
+        if motion_gate is not None and analysis_recorder is not None:
+            raise ValueError("analysis_recorder can't be combined with motion_gate")
+        self.analysis_replay = analysis_replay
+        self.analysis_recorder = analysis_recorder
+
+        self.rep_state = RepState()
+        # Walking and running count steps from a streaming cadence estimate
+        self.cadence = CadenceEstimator() if exercise_type in ("walk", "run") else None
+        self.frame_index = 0
+        self.blocked = False
+        self.feedback = None
+        self.detection_results = None
+        self.pose_results = None
+        self.last_annotated_frame = None
+        self.results_reusable = False  # Whether the motion gate may reuse the last frame's results
+        self.clock_offset = None  # Wall clock minus the first frame timestamp, for the history store
+        self.reps_recorded = 0
+
+    @property
+    def counter(self):
+        return self.rep_state.counter
+
+    @property
+    def status(self):
+        return self.rep_state.status
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def process(self, frame: np.ndarray, timestamp: float = None) -> np.ndarray:
+        """Run the pipeline on one camera frame and return the annotated frame.
+
+        timestamp is the frame's time in seconds (e.g. its position in a video file); by
+        default rep timing and cadence use the wall clock.
+        """
+        self.frame_index += 1
+        frame_index = self.frame_index
+
+        with tracer.span("resize", frame=frame_index):
+            frame = cv2.resize(frame, FRAME_SIZE, interpolation=cv2.INTER_AREA)
+
+        replay = self.analysis_replay
+        cached = replay is not None and frame_index <= len(replay)
+
+        # Static scene: reuse the previous pose, rep state, cheat verdict and overlay
+        if (not cached and self.motion_gate is not None and self.motion_gate.is_static(frame)
+                and self.results_reusable):
+            tracer.instant("motion_gate_skip", frame=frame_index)
+            return self.last_annotated_frame
+
+        if cached:
+            results = replay.pose_result(frame_index - 1)
+        else:
+            with tracer.span("preprocess", frame=frame_index):
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                frame_rgb.flags.writeable = False
+            with tracer.span("pose", frame=frame_index):
+                results = self.pose.process(frame_rgb)
+            frame_rgb.flags.writeable = True
+            frame = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+        self.pose_results = results
+        detection_results = None
+
+        try:
+            if results.pose_landmarks:
+                landmarks = results.pose_landmarks.landmark
+                with tracer.span("count", frame=frame_index):
+                    TypeOfExercise(landmarks).update_state(self.exercise_type, self.rep_state, self.cadence, timestamp)
+
+                # CHEAT DETECTION INTEGRATION
+                with tracer.span("cheat_detection", frame=frame_index):
+                    if cached:
+                        cached_verdict = replay.verdict(frame_index - 1)
+                        detection_results = CheatVerdict.from_dict(cached_verdict)
+                        self.cheat_detector.apply_cached_verdict(
+                            detection_results, cached_verdict.get('violation_counts'))
+                    else:
+                        detection_results = self.cheat_detector.process_frame(frame)
+                self.detection_results = detection_results
+                if self.session_store is not None and detection_results.has_issues:
+                    for violation in detection_results.violations:
+                        self.session_store.record_violation(self.session_id, violation,
+                                                            self._event_time(timestamp))
+
+                if not detection_results.session_active:
+                    # Session blocked
+                    block_message = self.message_handler.get_blocked_message()
+                    cv2.putText(frame, block_message, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+                    self._log(f"🚫 {block_message}")
+                    self.blocked = True
+                    return frame
+
+                # Display appropriate messages
+                if detection_results.has_issues:
+                    message = self.message_handler.format_comprehensive_message(detection_results)
+                    cv2.putText(frame, message, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, detection_results.overlay_color, 2)
+                    self._log(f"⚠️ {message}")
+
+                if detection_results.face_verified:
+                    # -- FEEDBACK SYSTEM INTEGRATION START --
+                    angle = rep_angle(landmarks, self.exercise_type)
+
+                    aux_metrics = self.cadence.aux_metrics() if self.cadence is not None else None
+
+                    with tracer.span("feedback", frame=frame_index):
+                        self.feedback = self.analyzer.analyze_rep_performance(
+                            angle, self.status, self.counter, aux_metrics, timestamp)
+                    self._log(f"Coach feedback: {self.feedback}")
+
+                    if self.session_store is not None and self.feedback.rep_completed:
+                        self._record_new_reps(self._event_time(timestamp))
+
+                    cv2.putText(frame, self.feedback.message, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2, cv2.LINE_AA)
+                    # -- FEEDBACK SYSTEM INTEGRATION END --
+
+            with tracer.span("draw", frame=frame_index):
+                if self.show_score_table:
+                    score_table(self.exercise_type, self.counter, self.status)
+
+                mp_drawing.draw_landmarks(
+                    frame,
+                    results.pose_landmarks,
+                    mp_pose.POSE_CONNECTIONS,
+                    LANDMARK_STYLE,
+                    CONNECTION_STYLE,
+                )
+
+        except Exception as e:
+            print("Error during feedback logic:", e)
+        finally:
+            # Frame-based checks (e.g. the no-face timer) only advance on processed frames,
+            # so results are reused only while a face is in view and nothing is wrong
+            self.results_reusable = (detection_results is not None and not detection_results.has_issues and
+                                     self.cheat_detector.no_face_frame_count == 0)
+            self._record_analysis(detection_results)
+
+        self.last_annotated_frame = frame
+        return frame
+
+    def _record_analysis(self, detection_results):
+        """Add this frame's pose landmarks and verdict to the analysis recorder, if any"""
+        if self.analysis_recorder is None:
+            return
+        if self.pose_results is not None and self.pose_results.pose_landmarks:
+            landmarks = landmarks_to_array(self.pose_results.pose_landmarks.landmark)
+        else:
+            landmarks = np.full((33, 4), np.nan, dtype=np.float32)
+        verdict = None
+        if detection_results is not None:
+            verdict = detection_results.to_dict()
+            if detection_results.has_issues:
+                verdict['violation_counts'] = self.cheat_detector.violation_counts.copy()
+        self.analysis_recorder.record(landmarks, verdict)
+
+    def _event_time(self, timestamp: float = None) -> float:
+        """Wall-clock time of a frame for the history store.
+
+        Frame timestamps (e.g. positions in a video file) are shifted onto the wall clock
+        at the first timestamped frame, so stored events keep the spacing of the video
+        even when it is processed faster or slower than real time.
+        """
+        if timestamp is None:
+            return time.time()
+        if self.clock_offset is None:
+            self.clock_offset = time.time() - timestamp
+        return timestamp + self.clock_offset
+
+    def _record_new_reps(self, completed_at: float = None):
+        analyzer = self.analyzer
+        while self.reps_recorded < len(analyzer.rep_times):
+            min_angle, max_angle = analyzer.rep_angle_extrema[self.reps_recorded]
+            self.session_store.record_rep(self.session_id, self.reps_recorded + 1,
+                                          analyzer.rep_times[self.reps_recorded],
+                                          analyzer.form_scores[self.reps_recorded],
+                                          min_angle, max_angle, completed_at)
+            self.reps_recorded += 1
+
+    def finish(self) -> str:
+        """Close out the session (history store included) and return the summary text"""
+        if self.session_store is not None:
+            stats = self.analyzer.get_performance_stats()
+            report = self.cheat_detector.get_session_report()
+            self.session_store.end_session(self.session_id, stats['total_reps'], stats['average_form_score'],
+                                           report['total_violations'], report['session_valid'])
+        return self.analyzer.generate_session_summary()
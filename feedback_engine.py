@@ -3,6 +3,31 @@ import numpy as np
 from collections import deque
 from utils import *
 
+
+class FeedbackResult:
+    """Feedback for the latest frame; str() gives the coaching message"""
+    __slots__ = ('message', 'angle', 'status', 'counter', 'rep_completed')
+
+    def __init__(self):
+        self.message = ""
+        self.angle = None
+        self.status = True
+        self.counter = 0
+        self.rep_completed = False  # True on the frame a rep's timing and form score were recorded
+
+    def __str__(self):
+        return self.message
+
+    def to_dict(self):
+        return {
+            'message': self.message,
+            'angle': self.angle,
+            'status': self.status,
+            'counter': self.counter,
+            'rep_completed': self.rep_completed
+        }
+
+
 class FeedbackAnalyzer:
     def __init__(self, exercise_type):
         self.exercise_type = exercise_type
@@ -13,7 +38,11 @@ class FeedbackAnalyzer:
         self.current_feedback = ""
         self.last_status = True
         self.session_start_time = time.time()
+        self.first_timestamp = None  # Video time of the first and latest frame, when given
+        self.last_timestamp = None
         self.rep_aux_metrics = []  # Extra metrics per rep
+        self.rep_angle_extrema = []  # (min_angle, max_angle) per completed rep
+        self.result = FeedbackResult()  # Reused for every frame
 
         # Thresholds by exercise type
         self.rules = {
@@ -49,14 +78,19 @@ class FeedbackAnalyzer:
         }
         self.exercise_config = self.rules.get(exercise_type, self.rules["sit-up"])
 
-    def analyze_rep_performance(self, angle, status, counter, aux_metrics=None):
-        current_time = time.time()
+    def analyze_rep_performance(self, angle, status, counter, aux_metrics=None, timestamp=None):
+        # Video time keeps rep timing right however fast frames are processed
+        if timestamp is not None:
+            current_time = timestamp
+            if self.first_timestamp is None:
+                self.first_timestamp = timestamp
+            self.last_timestamp = timestamp
+        else:
+            current_time = time.time()
         if "main" not in self.angle_histories:
             self.angle_histories['main'] = deque(maxlen=30)
         self.angle_histories['main'].append(angle)
-        if aux_metrics:
-            self.rep_aux_metrics.append(aux_metrics)
-
+        rep_completed = False
         if status != self.last_status:
             if status == False:  # Starting rep
                 self.rep_start_time = current_time
@@ -65,10 +99,22 @@ class FeedbackAnalyzer:
                 self.rep_times.append(rep_duration)
                 form_score = self._analyze_rep_form()
                 self.form_scores.append(form_score)
+                angles = self.angle_histories['main']
+                self.rep_angle_extrema.append((min(angles), max(angles)))
+                if aux_metrics:
+                    self.rep_aux_metrics.append(aux_metrics)
+                rep_completed = True
         self.last_status = status
 
         self.current_feedback = self._generate_realtime_feedback(angle, status, counter, aux_metrics)
-        return self.current_feedback
+
+        result = self.result
+        result.message = self.current_feedback
+        result.angle = angle
+        result.status = status
+        result.counter = counter
+        result.rep_completed = rep_completed
+        return result
 
     def _analyze_rep_form(self):
         if len(self.angle_histories['main']) < 10:
@@ -194,12 +240,17 @@ class FeedbackAnalyzer:
         else:
             return "Keep going!"
 
+    def _session_duration(self):
+        if self.first_timestamp is not None:
+            return self.last_timestamp - self.first_timestamp
+        return time.time() - self.session_start_time
+
     def get_performance_stats(self):
         stats = {
             'total_reps': len(self.rep_times),
             'average_rep_time': np.mean(self.rep_times) if self.rep_times else 0,
             'average_form_score': np.mean(self.form_scores) if self.form_scores else 0,
-            'session_duration': time.time() - self.session_start_time,
+            'session_duration': self._session_duration(),
             'current_feedback': self.current_feedback
         }
         return stats
@@ -210,7 +261,7 @@ class FeedbackAnalyzer:
         total_reps = len(self.rep_times)
         avg_rep_time = np.mean(self.rep_times)
         avg_form_score = np.mean(self.form_scores) if self.form_scores else 0
-        session_duration = time.time() - self.session_start_time
+        session_duration = self._session_duration()
         summary = [f"=== SESSION SUMMARY ===",
                    f"Total Reps: {total_reps}",
                    f"Session Duration: {session_duration:.1f} seconds",
@@ -0,0 +1,241 @@
+# frame_ring.py
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+FRAME_SHAPE = (480, 800, 3)
+LANDMARK_SHAPE = (33, 4)  # x, y, z, visibility per pose landmark
+
+_MAGIC = 0x56584652  # "VXFR"
+_META_FIELDS = 16
+# Indexes into the int64 metadata block
+_M_MAGIC, _M_SLOTS, _M_READERS, _M_H, _M_W, _M_C, _M_L0, _M_L1, _M_WRITE_SEQ, _M_CLOSED = range(10)
+
+
+class FrameSlot:
+    """Zero-copy view of one ring slot; valid until release() is called"""
+    __slots__ = ('seq', 'frame', 'landmarks', 'timestamp')
+
+    def __init__(self, seq: int, frame: np.ndarray, landmarks: np.ndarray, timestamp: float):
+        self.seq = seq
+        self.frame = frame
+        self.landmarks = landmarks
+        self.timestamp = timestamp
+
+
+class SharedFrameRing:
+    """Single-writer ring of fixed-size frame slots in shared memory.
+
+    Every frame gets a sequence number. Each reader has a cursor in shared memory; the
+    writer only reuses a slot once every reader has released the frame in it, so
+    readers get NumPy views straight into shared memory without copies or pickling.
+    One process creates the ring with create(), the others attach() by name.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool, reader_index: int = None):
+        self.shm = shm
+        self.owner = owner
+        self.reader_index = reader_index
+
+        meta = np.ndarray((_META_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if meta[_M_MAGIC] != _MAGIC:
+            raise ValueError(f"Shared memory block {shm.name} is not a frame ring")
+        slots, readers = int(meta[_M_SLOTS]), int(meta[_M_READERS])
+        frame_shape = (int(meta[_M_H]), int(meta[_M_W]), int(meta[_M_C]))
+        landmark_shape = (int(meta[_M_L0]), int(meta[_M_L1]))
+
+        offset = meta.nbytes
+        self.meta = meta
+        self.cursors = np.ndarray((readers,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.cursors.nbytes
+        self.slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.slot_seq.nbytes
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset += self.timestamps.nbytes
+        self.frames = np.ndarray((slots,) + frame_shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+        offset += self.frames.nbytes
+        self.landmarks = np.ndarray((slots,) + landmark_shape, dtype=np.float32, buffer=shm.buf, offset=offset)
+
+        self.slots = slots
+        self.readers = readers
+
+    @staticmethod
+    def _size(slots: int, readers: int, frame_shape: Tuple, landmark_shape: Tuple) -> int:
+        return (8 * (_META_FIELDS + readers + 2 * slots)
+                + slots * int(np.prod(frame_shape))
+                + 4 * slots * int(np.prod(landmark_shape)))
+
+    @classmethod
+    def create(cls, slots: int = 8, readers: int = 1, frame_shape: Tuple = FRAME_SHAPE,
+               landmark_shape: Tuple = LANDMARK_SHAPE, name: str = None) -> 'SharedFrameRing':
+        """Allocate a new ring; the creating process is the writer and unlinks it on close"""
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=cls._size(slots, readers, frame_shape, landmark_shape))
+        meta = np.ndarray((_META_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        meta[:] = 0
+        meta[[_M_SLOTS, _M_READERS, _M_H, _M_W, _M_C, _M_L0, _M_L1]] = (
+            slots, readers, *frame_shape, *landmark_shape)
+        meta[_M_MAGIC] = _MAGIC
+        ring = cls(shm, owner=True)
+        ring.cursors[:] = 0
+        ring.slot_seq[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, reader_index: int = None, track: bool = True) -> 'SharedFrameRing':
+        """Open an existing ring, as reader number reader_index (or as the writer if None).
+
+        Pass track=False from a process that was not started by the ring's creator: such a
+        process has its own resource tracker, which (before Python 3.13) would unlink the
+        block when the process exits. The creator and its children share one tracker and
+        keep the default.
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        if not track:
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return cls(shm, owner=False, reader_index=reader_index)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def write_seq(self) -> int:
+        return int(self.meta[_M_WRITE_SEQ])
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.meta[_M_CLOSED])
+
+    # ---- Writer ----
+
+    def try_write(self, frame: np.ndarray, landmarks: np.ndarray = None, timestamp: float = None) -> int:
+        """Copy a frame into the next slot; returns its sequence number, or 0 if the ring is full"""
+        seq = self.write_seq + 1
+        # The slot still holds frame seq - slots until the slowest reader releases it
+        if seq - self.slots > int(self.cursors.min()):
+            return 0
+
+        slot = seq % self.slots
+        self.slot_seq[slot] = -seq  # Mark the slot as being written
+        np.copyto(self.frames[slot], frame)
+        if landmarks is not None:
+            np.copyto(self.landmarks[slot], landmarks)
+        else:
+            self.landmarks[slot].fill(np.nan)
+        self.timestamps[slot] = time.time() if timestamp is None else timestamp
+        self.slot_seq[slot] = seq
+        self.meta[_M_WRITE_SEQ] = seq  # Publish last so readers never see a half-written slot
+        return seq
+
+    def write(self, frame: np.ndarray, landmarks: np.ndarray = None, timestamp: float = None,
+              timeout: float = None) -> int:
+        """Like try_write, but wait for a free slot; returns 0 on timeout"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            seq = self.try_write(frame, landmarks, timestamp)
+            if seq or (deadline is not None and time.perf_counter() >= deadline):
+                return seq
+            time.sleep(0.0002)
+
+    def close_stream(self):
+        """Tell readers that no more frames will be written"""
+        self.meta[_M_CLOSED] = 1
+
+    # ---- Readers ----
+
+    def read(self, timeout: float = None, latest: bool = False) -> FrameSlot:
+        """Wait for the reader's next frame and return a view of it (None on timeout or end of stream).
+
+        With latest=True, frames the reader has fallen behind on are skipped.
+        """
+        cursor = int(self.cursors[self.reader_index])
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.write_seq <= cursor:
+            if self.closed or (deadline is not None and time.perf_counter() >= deadline):
+                return None
+            time.sleep(0.0002)
+
+        seq = self.write_seq if latest else cursor + 1
+        if latest:
+            self.cursors[self.reader_index] = seq - 1  # Free the skipped slots for the writer
+        slot = seq % self.slots
+        if self.slot_seq[slot] != seq:
+            raise RuntimeError(f"Frame {seq} was overwritten before it was read")
+        return FrameSlot(seq, self.frames[slot], self.landmarks[slot], float(self.timestamps[slot]))
+
+    def release(self, frame_slot: FrameSlot):
+        """Hand the slot back to the writer; the views in frame_slot must not be used afterwards"""
+        self.cursors[self.reader_index] = frame_slot.seq
+
+    def close(self):
+        # Drop our views before closing the mapping
+        self.meta = self.cursors = self.slot_seq = self.timestamps = self.frames = self.landmarks = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ---- Benchmark: shared-memory ring vs pickling frames through a multiprocessing.Queue ----
+
+def _ring_consumer(name: str, count: int, result):
+    ring = SharedFrameRing.attach(name, reader_index=0)
+    checksum = 0
+    for _ in range(count):
+        frame_slot = ring.read()
+        checksum += int(frame_slot.frame[0, 0, 0]) + int(frame_slot.landmarks[0, 0] > 0)
+        ring.release(frame_slot)
+    result.put(checksum)
+    ring.close()
+
+
+def _queue_consumer(frames: mp.Queue, count: int, result):
+    checksum = 0
+    for _ in range(count):
+        frame, landmarks, timestamp = frames.get()
+        checksum += int(frame[0, 0, 0]) + int(landmarks[0, 0] > 0)
+    result.put(checksum)
+
+
+def benchmark(count: int = 600, slots: int = 8) -> dict:
+    """Frames per second through each transport at 800x480x3 with pose landmarks attached"""
+    frame = np.random.randint(0, 255, FRAME_SHAPE, dtype=np.uint8)
+    landmarks = np.random.rand(*LANDMARK_SHAPE).astype(np.float32)
+    result = mp.Queue()
+    fps = {}
+
+    ring = SharedFrameRing.create(slots=slots, readers=1)
+    consumer = mp.Process(target=_ring_consumer, args=(ring.name, count, result))
+    consumer.start()
+    start = time.perf_counter()
+    for _ in range(count):
+        ring.write(frame, landmarks)
+    result.get()
+    fps['shared_memory_ring'] = count / (time.perf_counter() - start)
+    consumer.join()
+    ring.close()
+
+    frames = mp.Queue(maxsize=slots)
+    consumer = mp.Process(target=_queue_consumer, args=(frames, count, result))
+    consumer.start()
+    start = time.perf_counter()
+    for _ in range(count):
+        frames.put((frame, landmarks, time.time()))
+    result.get()
+    fps['pickled_queue'] = count / (time.perf_counter() - start)
+    consumer.join()
+
+    return fps
+
+
+if __name__ == "__main__":
+    frame_mb = np.prod(FRAME_SHAPE) / 1e6
+    for transport, rate in benchmark().items():
+        print(f"{transport:>20}: {rate:8.1f} frames/s ({rate * frame_mb:7.1f} MB/s)")
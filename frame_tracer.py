@@ -0,0 +1,111 @@
+# frame_tracer.py
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict
+import logging
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # One complete ('X') event, so a full buffer can never keep an end without its begin
+        self.tracer._record('X', self.name, self.args, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class FrameTracer:
+    """Opt-in recorder of per-stage timings in Chrome trace-event JSON"""
+
+    def __init__(self, max_events: int = 500000):
+        self.enabled = False
+        self.output_path = None
+        self.events = deque(maxlen=max_events)  # Oldest events are dropped once full
+        self.thread_names = {}
+        self.logger = logging.getLogger(__name__)
+        self._owner_pid = os.getpid()
+        self._epoch = time.perf_counter()
+
+    def enable(self, output_path: str, max_events: int = None):
+        """Start recording; the buffer is written to output_path at exit of this process"""
+        if max_events is not None:
+            self.events = deque(maxlen=max_events)
+        self.output_path = output_path
+        self.enabled = True
+        self._owner_pid = os.getpid()
+        atexit.register(self.flush)
+
+    def span(self, name: str, **args):
+        """Context manager timing one stage; free when tracing is disabled"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def instant(self, name: str, **args):
+        """Mark a single point in time, e.g. a dropped frame"""
+        if self.enabled:
+            self._record('i', name, args)
+
+    def _record(self, phase: str, name: str, args: Dict, start: float = None, duration: float = None):
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self.thread_names:
+            self.thread_names[tid] = thread.name
+        event = {
+            'name': name,
+            'ph': phase,
+            'ts': ((time.perf_counter() if start is None else start) - self._epoch) * 1e6,  # microseconds
+            'pid': os.getpid(),
+            'tid': tid
+        }
+        if duration is not None:
+            event['dur'] = duration * 1e6
+        if phase == 'i':
+            event['s'] = 't'
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def flush(self) -> str:
+        """Write the buffered events as a Chrome trace file and return its path.
+
+        Only the process that enabled the tracer writes; a forked child inherits a copy of
+        the tracer but must not overwrite the parent's file, and its events are not kept.
+        """
+        if not self.enabled or self.output_path is None or os.getpid() != self._owner_pid:
+            return None
+
+        path = self.output_path
+        pid = os.getpid()
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in self.thread_names.items()
+        ]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': metadata + list(self.events), 'displayTimeUnit': 'ms'}, f)
+
+        self.logger.info(f"Wrote {len(self.events)} trace events to {path}")
+        return path
+
+
+# Process-wide tracer shared by main.py and the cheat detector
+tracer = FrameTracer()
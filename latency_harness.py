@@ -0,0 +1,134 @@
+# latency_harness.py
+import argparse
+import json
+import time
+from typing import Dict
+
+import numpy as np
+
+from cheat_detection_system import ComprehensiveCheatDetector
+from exercise_session import ExerciseSession, mp_pose
+from motion_gate import MotionGate
+from alloc_profiler import AllocationProfiler
+from pose_roi import RoiPose
+from video_reader import SimulatedCamera
+
+
+def run_latency_harness(video_path: str, exercise_type: str, user_id: str = "latency_harness",
+                        registered_photo: str = None, motion_gate: bool = False,
+                        allow_blocking: bool = False, memory_profile: bool = False,
+                        pose_roi: bool = False) -> Dict:
+    """Replay a video through the full main.py pipeline headless and measure capture-to-feedback latency"""
+    camera = SimulatedCamera(video_path)
+    cheat_detector = ComprehensiveCheatDetector(user_id, registered_photo)
+    if not allow_blocking:
+        # Keep the full pipeline running; a blocked session short-circuits process_frame
+        cheat_detector.max_violations = float('inf')
+
+    profiler = AllocationProfiler().start() if memory_profile else None
+    latencies = []
+    with mp_pose.Pose(min_detection_confidence=0.5,
+                      min_tracking_confidence=0.5) as pose:
+        session = ExerciseSession(exercise_type, RoiPose(pose) if pose_roi else pose, cheat_detector,
+                                  motion_gate=MotionGate() if motion_gate else None,
+                                  show_score_table=False, verbose=False)
+
+        start = time.perf_counter()
+        while camera.isOpened():
+            ret, frame = camera.read()
+            if not ret:
+                break
+            session.process(frame)
+            # Feedback text and rep count for this frame are available now
+            latencies.append(time.perf_counter() - camera.last_capture_time)
+            if profiler is not None:
+                profiler.tick(session.frame_index)
+            if session.blocked:
+                break
+        elapsed = time.perf_counter() - start
+
+        memory = None
+        if profiler is not None:
+            memory = profiler.report()  # Before the pose model is released
+            profiler.stop()
+
+    camera.release()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'video': video_path,
+        'exercise_type': exercise_type,
+        'source_fps': camera.fps,
+        'frames_captured': camera.frames_captured,
+        'frames_processed': len(latencies),
+        'frames_dropped': camera.frames_dropped,
+        'achieved_fps': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'mean': float(np.mean(latencies_ms)) if len(latencies) else 0.0,
+            'p50': float(np.percentile(latencies_ms, 50)) if len(latencies) else 0.0,
+            'p90': float(np.percentile(latencies_ms, 90)) if len(latencies) else 0.0,
+            'p99': float(np.percentile(latencies_ms, 99)) if len(latencies) else 0.0,
+            'max': float(np.max(latencies_ms)) if len(latencies) else 0.0,
+        },
+        'final_counter': session.counter,
+        'blocked': session.blocked,
+        'memory': memory
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-t",
+                    "--exercise_type",
+                    type=str,
+                    help='Type of activity to do',
+                    required=True)
+    ap.add_argument("-vs",
+                    "--video_source",
+                    type=str,
+                    help='Path to the video played through the simulated camera',
+                    required=True)
+    ap.add_argument("-p",
+                    "--registered_photo",
+                    type=str,
+                    help='Registered photo, so the identity check and coach feedback run',
+                    required=False)
+    ap.add_argument("-mg",
+                    "--motion_gate",
+                    action="store_true",
+                    help='Reuse the previous results on static frames')
+    ap.add_argument("-roi",
+                    "--pose_roi",
+                    action="store_true",
+                    help='Run pose inference on a crop around the athlete')
+    ap.add_argument("-mp",
+                    "--memory_profile",
+                    action="store_true",
+                    help='Include a tracemalloc memory growth report (slows processing down)')
+    ap.add_argument("-o",
+                    "--output",
+                    type=str,
+                    help='Write the report as JSON to this path',
+                    required=False)
+    args = vars(ap.parse_args())
+
+    report = run_latency_harness(args["video_source"], args["exercise_type"],
+                                 registered_photo=args["registered_photo"],
+                                 motion_gate=args["motion_gate"],
+                                 memory_profile=args["memory_profile"],
+                                 pose_roi=args["pose_roi"])
+
+    latency = report['latency_ms']
+    print(f"Frames: {report['frames_processed']} processed, {report['frames_dropped']} dropped "
+          f"of {report['frames_captured']} captured")
+    print(f"FPS: {report['achieved_fps']:.1f} achieved / {report['source_fps']:.1f} source")
+    print(f"Latency (ms): p50 {latency['p50']:.1f}  p90 {latency['p90']:.1f}  "
+          f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    print(f"Final count: {report['final_counter']}")
+    if report['memory'] is not None:
+        print(f"Memory growth after warm-up: {report['memory']['rss_growth_mb']:.1f} MB resident, "
+              f"{report['memory']['traced_growth_mb']:.2f} MB traced")
+
+    if args["output"] is not None:
+        with open(args["output"], 'w') as f:
+            json.dump(report, f, indent=2)
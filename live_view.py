@@ -0,0 +1,184 @@
+# live_view.py
+import hmac
+import threading
+import time
+
+import cv2
+import numpy as np
+from flask import Flask, Response, abort, request
+from werkzeug.serving import make_server
+
+PAGE = """<!doctype html>
+<html><head><title>VisionX live view</title></head>
+<body style="margin:0;background:#111"><img src="/stream{query}" style="width:100%;height:auto"></body></html>
+"""
+
+
+class LiveView:
+    """MJPEG-over-HTTP view of the annotated frames for remote viewers.
+
+    publish() only stores a reference to the newest frame, so the assessment loop never
+    waits on encoding or the network. A worker thread JPEG-encodes each new frame once
+    (and only while someone is watching) and all viewers share the encoded bytes. Each
+    viewer is sent the newest encoded frame whenever it is ready for one, so a slow
+    viewer skips frames instead of holding up the loop or the other viewers.
+
+    The stream shows the athlete's camera, so it only listens on localhost by default.
+    When host exposes it to the network, set token: every request must then carry it
+    as ?token=..., or is refused with 403.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5000, quality: int = 80, token: str = None):
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self.token = token
+
+        self._condition = threading.Condition()
+        self._frame = None  # newest published frame, not yet encoded
+        self._frame_seq = 0
+        self._jpeg = None  # newest encoded frame, shared by every viewer
+        self._jpeg_seq = 0
+        self._viewers = 0
+        self._running = False
+
+        self.frames_encoded = 0
+        self.app = self._create_app()
+        self._server = None
+        self._threads = []
+
+    def _create_app(self) -> Flask:
+        app = Flask(__name__)
+
+        @app.before_request
+        def check_token():
+            if self.token is not None and not hmac.compare_digest(
+                    request.args.get("token", "").encode(), self.token.encode()):
+                abort(403)
+
+        @app.route("/")
+        def index():
+            return PAGE.format(query="" if self.token is None else "?token=" + self.token)
+
+        @app.route("/stream")
+        def stream():
+            return Response(self._stream(), mimetype="multipart/x-mixed-replace; boundary=frame")
+
+        return app
+
+    @property
+    def viewers(self) -> int:
+        return self._viewers
+
+    def start(self) -> 'LiveView':
+        """Start the encoder thread and the HTTP server in the background"""
+        self._running = True
+        self._server = make_server(self.host, self.port, self.app, threaded=True)
+        self.port = self._server.server_port  # Resolves port 0 to the port actually bound
+        self._threads = [threading.Thread(target=self._encode_loop, name="live-view-encoder", daemon=True),
+                         threading.Thread(target=self._server.serve_forever, name="live-view-http", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def publish(self, frame: np.ndarray):
+        """Offer the newest annotated frame; returns immediately"""
+        with self._condition:
+            self._frame = frame
+            self._frame_seq += 1
+            self._condition.notify_all()
+
+    def _encode_loop(self):
+        encoded_seq = 0
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+        while self._running:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: not self._running or (self._viewers and self._frame_seq != encoded_seq))
+                if not self._running:
+                    return
+                frame, encoded_seq = self._frame, self._frame_seq
+
+            # Encode outside the lock so publish() never blocks on it
+            ok, jpeg = cv2.imencode(".jpg", frame, params)
+            if not ok:
+                continue
+            self.frames_encoded += 1
+            with self._condition:
+                self._jpeg = jpeg.tobytes()
+                self._jpeg_seq = encoded_seq
+                self._condition.notify_all()
+
+    def _stream(self):
+        """Generator for one viewer: newest encoded frame each time the viewer is ready"""
+        with self._condition:
+            self._viewers += 1
+            self._condition.notify_all()
+        sent_seq = 0
+        try:
+            while self._running:
+                with self._condition:
+                    # Time out now and then so a viewer of a stalled stream notices shutdown
+                    if not self._condition.wait_for(
+                            lambda: not self._running or self._jpeg_seq != sent_seq, timeout=1.0):
+                        continue
+                    if not self._running:
+                        return
+                    jpeg, sent_seq = self._jpeg, self._jpeg_seq
+                yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: " +
+                       str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+        finally:
+            with self._condition:
+                self._viewers -= 1
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-vs",
+                    "--video_source",
+                    type=str,
+                    help='Path to input video (default: webcam)',
+                    required=False)
+    ap.add_argument("-p",
+                    "--port",
+                    type=int,
+                    default=5000,
+                    help='HTTP port to serve the stream on')
+    ap.add_argument("-H",
+                    "--host",
+                    type=str,
+                    default="127.0.0.1",
+                    help='Address to listen on; 0.0.0.0 exposes the stream to the network')
+    ap.add_argument("-k",
+                    "--token",
+                    type=str,
+                    help='Require ?token=<token> on every request',
+                    required=False)
+    args = vars(ap.parse_args())
+
+    # Stream a source without analysis, e.g. to check the viewer setup
+    cap = cv2.VideoCapture(args["video_source"] if args["video_source"] is not None else 0)
+    view = LiveView(args["host"], args["port"], token=args["token"]).start()
+    query = "" if args["token"] is None else "?token=" + args["token"]
+    print(f"Live view on http://{view.host}:{view.port}/{query}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            view.publish(frame)
+            time.sleep(1 / 30)
+    finally:
+        view.stop()
+        cap.release()
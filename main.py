@@ -1,15 +1,18 @@
 ## import packages
 import cv2
 import argparse
-import mediapipe as mp
-import numpy as np
 
-from utils import *
-from body_part_angle import BodyPartAngle
-from types_of_exercise import TypeOfExercise
-from feedback_engine import FeedbackAnalyzer
 from cheat_detection_system import ComprehensiveCheatDetector
 from cheat_messages import EnhancedCheatMessages
+from session_store import SessionStore
+from frame_tracer import tracer
+from motion_gate import MotionGate
+from exercise_session import ExerciseSession, mp_pose, FRAME_SIZE, POSE_SETTINGS
+from analysis_cache import AnalysisCache, AnalysisRecorder, AnalysisReplay
+from live_view import LiveView
+from alloc_profiler import AllocationProfiler
+from pose_roi import RoiPose, ROI_SETTINGS
+from video_reader import PrefetchingVideoReader
 # from user_registration import UserRegistration
 
 
@@ -25,18 +28,75 @@ ap.add_argument("-vs",
                 type=str,
                 help='Path to input video',
                 required=False)
+ap.add_argument("-s",
+                "--start",
+                type=float,
+                help='Start time in seconds within the video file',
+                required=False)
+ap.add_argument("-e",
+                "--end",
+                type=float,
+                help='End time in seconds within the video file',
+                required=False)
+ap.add_argument("-fs",
+                "--frame_stride",
+                type=int,
+                default=1,
+                help='Analyse every n-th frame of the video file')
+ap.add_argument("-db",
+                "--session_db",
+                type=str,
+                help='Path to a SQLite file for session and rep history',
+                required=False)
+ap.add_argument("-tr",
+                "--trace",
+                type=str,
+                help='Write a Chrome trace-event JSON of per-frame stage timings to this path',
+                required=False)
+ap.add_argument("-mg",
+                "--motion_gate",
+                action="store_true",
+                help='Reuse the previous results on static frames (e.g. rest between sets)')
+ap.add_argument("-cd",
+                "--cache_dir",
+                type=str,
+                help='Cache pose landmarks and cheat verdicts of video files in this directory',
+                required=False)
+ap.add_argument("-lv",
+                "--live_view",
+                type=int,
+                help='Serve the annotated frames as an MJPEG stream on this HTTP port',
+                required=False)
+ap.add_argument("-lvh",
+                "--live_view_host",
+                type=str,
+                default="127.0.0.1",
+                help='Address the live view listens on; 0.0.0.0 exposes it to the network (use --live_view_token)')
+ap.add_argument("-lvt",
+                "--live_view_token",
+                type=str,
+                help='Require ?token=<token> on live view requests',
+                required=False)
+ap.add_argument("-roi",
+                "--pose_roi",
+                action="store_true",
+                help='Run pose inference on a crop around the athlete (for athletes small in frame)')
+ap.add_argument("-mp",
+                "--memory_profile",
+                type=str,
+                help='Sample tracemalloc snapshots and write a memory growth report (JSON) to this path',
+                required=False)
 args = vars(ap.parse_args())
 
-## instantiate FeedbackAnalyzer (before loop)
-analyzer = FeedbackAnalyzer(args["exercise_type"])
+if args["trace"] is not None:
+    tracer.enable(args["trace"])
 
-## setup mediapipe drawing and pose
-mp_drawing = mp.solutions.drawing_utils
-mp_pose = mp.solutions.pose
+profiler = AllocationProfiler().start() if args["memory_profile"] is not None else None
 
 ## setting the video source
 if args["video_source"] is not None:
-    cap = cv2.VideoCapture(args["video_source"])
+    # Decodes ahead on a background thread; frames carry their time in the video
+    cap = PrefetchingVideoReader(args["video_source"], args["start"], args["end"], args["frame_stride"])
 else:
     cap = cv2.VideoCapture(0)  # webcam
 
@@ -50,93 +110,99 @@ registered_photo = r"C:\Users\nanin\OneDrive\Pictures\Camera Roll\WIN_20250926_1
 cheat_detector = ComprehensiveCheatDetector(user_id, registered_photo)
 message_handler = EnhancedCheatMessages()
 
+# Optional session history store (writes happen on a background thread)
+session_store = None
+session_id = None
+if args["session_db"] is not None:
+    session_store = SessionStore(args["session_db"])
+    session_id = session_store.start_session(user_id, args["exercise_type"])
+
+motion_gate = MotionGate() if args["motion_gate"] else None
+
+# Optional analysis cache: re-running the same video file skips pose and cheat inference
+analysis_cache = None
+analysis_replay = None
+analysis_recorder = None
+whole_video = args["start"] is None and args["end"] is None and args["frame_stride"] == 1
+if args["cache_dir"] is not None and args["video_source"] is not None and not whole_video:
+    print("Analysis cache only applies to whole videos; ignoring --cache_dir")
+elif args["cache_dir"] is not None and args["video_source"] is not None:
+    analysis_cache = AnalysisCache(args["cache_dir"])
+    # ROI inference changes the landmarks; runs without it keep their existing fingerprint
+    pose_settings = dict(POSE_SETTINGS, pose_roi=ROI_SETTINGS) if args["pose_roi"] else POSE_SETTINGS
+    cache_fingerprint = AnalysisCache.config_fingerprint(pose_settings, FRAME_SIZE,
+                                                         cheat_detector.analysis_settings())
+    cache_entry = analysis_cache.load(args["video_source"], cache_fingerprint)
+    if cache_entry is not None:
+        print("Using cached analysis for " + args["video_source"])
+        analysis_replay = AnalysisReplay(cache_entry)
+    elif motion_gate is not None:
+        print("No cached analysis; runs with --motion_gate don't record one")
+    else:
+        analysis_recorder = AnalysisRecorder()
+
+# Optional remote view for trainers (http://<host>:<port>/?token=<token>)
+live_view = None
+if args["live_view"] is not None:
+    live_view = LiveView(args["live_view_host"], args["live_view"], token=args["live_view_token"]).start()
+    print(f"Live view on {live_view.host}:{live_view.port}")
+    if args["live_view_host"] not in ("127.0.0.1", "localhost") and args["live_view_token"] is None:
+        print("Warning: the live view is reachable from the network without a token")
+
 ## setup mediapipe pose detector
-with mp_pose.Pose(min_detection_confidence=0.5,
-                  min_tracking_confidence=0.5) as pose:
+with mp_pose.Pose(**POSE_SETTINGS) as pose:
+    if args["pose_roi"]:
+        pose = RoiPose(pose, **ROI_SETTINGS)
 
-    counter = 0  # movement of exercise
-    status = True  # state of move
+    session = ExerciseSession(args["exercise_type"], pose, cheat_detector, message_handler,
+                              session_store=session_store, session_id=session_id,
+                              motion_gate=motion_gate, analysis_replay=analysis_replay,
+                              analysis_recorder=analysis_recorder)
+    end_of_video = False
 
     while cap.isOpened():
-        ret, frame = cap.read()
+        with tracer.span("capture", frame=session.frame_index + 1):
+            ret, frame = cap.read()
         if not ret:
             print("Failed to grab frame.")
+            end_of_video = True
+            break
+
+        # Video time for file sources, wall clock for the webcam
+        timestamp = cap.last_timestamp if args["video_source"] is not None else None
+        frame = session.process(frame, timestamp)
+        if profiler is not None:
+            profiler.tick(session.frame_index)
+        if live_view is not None:
+            live_view.publish(frame)
+        if session.blocked:
             break
 
-        frame = cv2.resize(frame, (800, 480), interpolation=cv2.INTER_AREA)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_rgb.flags.writeable = False
-        results = pose.process(frame_rgb)
-        frame_rgb.flags.writeable = True
-        frame = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-
-        try:
-            if results.pose_landmarks:
-                landmarks = results.pose_landmarks.landmark
-                counter, status = TypeOfExercise(landmarks).calculate_exercise(
-                    args["exercise_type"], counter, status)
-                
-                            # CHEAT DETECTION INTEGRATION
-                detection_results = cheat_detector.process_frame(frame)
-
-                if not detection_results['session_active']:
-                    # Session blocked
-                    block_message = message_handler.get_blocked_message()
-                    cv2.putText(frame, block_message, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                    print(f"🚫 {block_message}")
-                    break
-                
-                # Display appropriate messages
-                if detection_results['violations'] or detection_results['warnings']:
-                    message = message_handler.format_comprehensive_message(detection_results)
-                    cv2.putText(frame, message, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, detection_results['overlay_color'], 2)
-                    print(f"⚠️ {message}")
-
-
-                if detection_results['face_verified']:
-                    # -- FEEDBACK SYSTEM INTEGRATION START --
-                    # Select relevant rep angle for each exercise
-                    if args["exercise_type"] == "sit-up":
-                        angle = BodyPartAngle(landmarks).angle_of_the_abdomen()
-                    elif args["exercise_type"] == "push-up":
-                        angle = BodyPartAngle(landmarks).angle_of_the_left_arm()
-                    elif args["exercise_type"] == "pull-up":
-                        angle = BodyPartAngle(landmarks).angle_of_the_left_arm()  # or right arm if preferred
-                    elif args["exercise_type"] == "squat":
-                        angle = BodyPartAngle(landmarks).angle_of_the_left_leg()
-                    elif args["exercise_type"] == "vertical jump":
-                        angle = BodyPartAngle(landmarks).angle_of_the_left_leg()
-                    elif args["exercise_type"] == "run":
-                        angle = BodyPartAngle(landmarks).angle_of_the_left_leg()  # Ideally stride info; adjust as needed
-                    else:
-                        angle = BodyPartAngle(landmarks).angle_of_the_abdomen()
-
-                    feedback = analyzer.analyze_rep_performance(angle, status, counter)
-                    print(f"Coach feedback: {feedback}")
-
-                    cv2.putText(frame, f"{feedback}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2, cv2.LINE_AA)
-                    # -- FEEDBACK SYSTEM INTEGRATION END --
-
-            score_table(args["exercise_type"], counter, status)
-            
-            mp_drawing.draw_landmarks(
-                frame,
-                results.pose_landmarks,
-                mp_pose.POSE_CONNECTIONS,
-                mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2, circle_radius=2),
-                mp_drawing.DrawingSpec(color=(174, 139, 45), thickness=2, circle_radius=2),
-            )
-
-        except Exception as e:
-            print("Error during feedback logic:", e)
-
-        cv2.imshow('Video', frame)
-        if cv2.waitKey(10) & 0xFF == ord('q'):
-            print("counter: " + str(counter))
+        with tracer.span("display", frame=session.frame_index):
+            cv2.imshow('Video', frame)
+            key = cv2.waitKey(10)
+        if key & 0xFF == ord('q'):
+            print("counter: " + str(session.counter))
             break
 
     # Print session summary AFTER exiting video loop
-    print(analyzer.generate_session_summary())
+    print(session.finish())
+
+    # Only a fully analysed video is cached
+    if analysis_recorder is not None and end_of_video:
+        analysis_cache.store(args["video_source"], cache_fingerprint,
+                             analysis_recorder.landmark_array(), analysis_recorder.verdicts)
+
+    if session_store is not None:
+        session_store.close()
+
+    if live_view is not None:
+        live_view.stop()
+
+    if profiler is not None:
+        memory_report = profiler.write_report(args["memory_profile"])
+        print(f"Memory growth after warm-up: {memory_report['rss_growth_mb']:.1f} MB resident, "
+              f"{memory_report['traced_growth_mb']:.2f} MB traced")
 
     cap.release()
     cv2.destroyAllWindows()
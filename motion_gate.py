@@ -0,0 +1,33 @@
+# motion_gate.py
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Cheap frame-difference check used to skip pose and anti-cheat work on static frames"""
+
+    def __init__(self, pixel_threshold: int = 12, changed_fraction: float = 0.005,
+                 max_stale_frames: int = 30, size=(80, 48)):
+        self.pixel_threshold = pixel_threshold  # Gray-level change that counts as motion
+        self.changed_fraction = changed_fraction  # Share of changed pixels that makes a frame "moving"
+        self.max_stale_frames = max_stale_frames  # Force a full evaluation at least this often (~1s at 30fps)
+        self.size = size
+        self.reference = None  # Downsampled gray copy of the last fully processed frame
+        self.stale_frames = 0
+
+    def is_static(self, frame: np.ndarray) -> bool:
+        """True if the frame barely differs from the last processed one and results may be reused"""
+        small = cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+
+        if self.reference is not None and self.stale_frames < self.max_stale_frames:
+            diff = cv2.absdiff(small, self.reference)
+            changed = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+            if changed < self.changed_fraction:
+                self.stale_frames += 1
+                return True
+
+        # Compare against the frame that is about to be processed, not the previous one,
+        # so slow drift still accumulates into a re-evaluation
+        self.reference = small
+        self.stale_frames = 0
+        return False
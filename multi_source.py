@@ -0,0 +1,286 @@
+# multi_source.py
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+import logging
+
+import cv2
+
+from cheat_detection_system import ComprehensiveCheatDetector
+from cheat_messages import EnhancedCheatMessages
+from exercise_session import ExerciseSession, mp_pose, POSE_SETTINGS
+from video_reader import SimulatedCamera
+
+
+class FrameSource:
+    """Reads one camera or video on its own thread and keeps only the newest frame.
+
+    Frames the scheduler hasn't taken by the time a newer one arrives are dropped, so a
+    station that gets less inference time falls behind in frame rate, not in latency.
+    All sources notify one shared condition so the scheduler can wait on any of them.
+    """
+
+    def __init__(self, cap, condition: threading.Condition):
+        self.cap = cap
+        self.condition = condition
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.finished = False
+        self.waiting_since = None  # Capture time of the oldest frame not yet served
+        self._pending = None  # (frame, capture_time)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="frame-source", daemon=True)
+
+    def start(self) -> 'FrameSource':
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            capture_time = getattr(self.cap, 'last_capture_time', None) or time.perf_counter()
+            with self.condition:
+                if self._pending is not None:
+                    self.frames_dropped += 1
+                else:
+                    self.waiting_since = capture_time
+                self._pending = (frame, capture_time)
+                self.frames_captured += 1
+                self.condition.notify_all()
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+
+    @property
+    def ready(self) -> bool:
+        return self._pending is not None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.finished and self._pending is None
+
+    def take(self):
+        """(frame, capture_time) of the newest frame; call with the condition held"""
+        pending, self._pending = self._pending, None
+        self.waiting_since = None
+        return pending
+
+    def stop(self):
+        # The reader thread notices the flag after its current read(); the capture is only
+        # released once it has exited, as releasing a VideoCapture mid-read isn't safe
+        self._stopped = True
+        self._thread.join(timeout=2.0)
+        if self._thread.is_alive():
+            logging.getLogger(__name__).warning("Frame source did not stop; leaving its capture open")
+            return
+        self.cap.release()
+
+
+class Station:
+    """One exercise station: its source plus its own session, analyzer and cheat detector"""
+
+    def __init__(self, name: str, exercise_type: str, source: FrameSource, session: ExerciseSession):
+        self.name = name
+        self.exercise_type = exercise_type
+        self.source = source
+        self.session = session
+        self.frames_processed = 0
+        self.processing_time = 0.0
+        self.done = False
+        self.recent = deque(maxlen=60)  # perf_counter() of recently processed frames
+
+    def fps(self) -> float:
+        if len(self.recent) < 2:
+            return 0.0
+        return (len(self.recent) - 1) / (self.recent[-1] - self.recent[0])
+
+
+class FairScheduler:
+    """Chooses which ready station gets the next inference slot.
+
+    'round_robin' cycles through the stations that have a frame waiting. 'deadline'
+    serves the earliest deadline first, where a station's deadline is the capture
+    time of its oldest unserved frame plus one source frame period. The deadline is
+    not pushed back when a waiting frame is replaced by a newer one, so a station
+    with a fast camera cannot keep starving the others.
+    """
+
+    POLICIES = ('round_robin', 'deadline')
+
+    def __init__(self, policy: str = 'deadline'):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}'")
+        self.policy = policy
+        self._next = 0
+
+    def pick(self, stations: List[Station]) -> Station:
+        ready = [station for station in stations if not station.done and station.source.ready]
+        if not ready:
+            return None
+        if self.policy == 'deadline':
+            return min(ready, key=lambda station: station.source.waiting_since + 1.0 / station.source.fps)
+        # Round robin: first ready station at or after the rotating position
+        count = len(stations)
+        for offset in range(count):
+            station = stations[(self._next + offset) % count]
+            if station in ready:
+                self._next = (stations.index(station) + 1) % count
+                return station
+        return None
+
+
+def open_source(source: str):
+    """Webcam index ("0") or a video file played back in real time like a camera"""
+    if source.isdigit():
+        cap = cv2.VideoCapture(int(source))
+        cap.set(3, 800)  # width
+        cap.set(4, 480)  # height
+        return cap
+    return SimulatedCamera(source)
+
+
+def run_multi_source(specs: List[Dict], policy: str = 'deadline', display: bool = True,
+                     report_interval: float = 5.0) -> Dict:
+    """Run several stations in one process, sharing the inference thread between them.
+
+    Each spec has 'exercise_type' and 'source', and optionally 'user_id' and
+    'registered_photo'. Every station gets its own Pose graph (MediaPipe tracks the
+    pose from frame to frame, so streams can't share one), cheat detector and
+    FeedbackAnalyzer; the process, the loaded libraries and the face models are shared.
+    """
+    condition = threading.Condition()
+    scheduler = FairScheduler(policy)
+    stations = []
+    poses = []
+
+    for index, spec in enumerate(specs):
+        name = f"station {index + 1}"
+        user_id = spec.get('user_id') or f"station_{index + 1}"
+        cheat_detector = ComprehensiveCheatDetector(user_id, spec.get('registered_photo'))
+        pose = mp_pose.Pose(**POSE_SETTINGS)
+        poses.append(pose)
+        session = ExerciseSession(spec['exercise_type'], pose, cheat_detector, EnhancedCheatMessages(),
+                                  show_score_table=False, verbose=False)
+        source = FrameSource(open_source(spec['source']), condition)
+        stations.append(Station(name, spec['exercise_type'], source, session))
+
+    start = time.perf_counter()
+    for station in stations:
+        station.source.start()
+
+    last_report = start
+    try:
+        while True:
+            with condition:
+                for station in stations:
+                    if not station.done and station.source.exhausted:
+                        station.done = True
+                if all(station.done for station in stations):
+                    break
+                station = scheduler.pick(stations)
+                if station is None:
+                    condition.wait(timeout=0.1)
+                    continue
+                frame, capture_time = station.source.take()
+
+            began = time.perf_counter()
+            annotated = station.session.process(frame, capture_time)
+            now = time.perf_counter()
+            station.processing_time += now - began
+            station.frames_processed += 1
+            station.recent.append(now)
+            if station.session.blocked:
+                station.done = True
+
+            if display:
+                cv2.imshow(f"VisionX - {station.name} ({station.exercise_type})", annotated)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+
+            if report_interval and now - last_report >= report_interval:
+                last_report = now
+                print("  ".join(f"{s.name}: {s.fps():5.1f} fps, {s.session.counter} reps" for s in stations))
+    finally:
+        elapsed = time.perf_counter() - start
+        for station in stations:
+            station.source.stop()
+        for pose in poses:
+            pose.close()
+        if display:
+            cv2.destroyAllWindows()
+
+    return {
+        'policy': policy,
+        'elapsed_s': elapsed,
+        'stations': [{
+            'name': station.name,
+            'exercise_type': station.exercise_type,
+            'source_fps': station.source.fps,
+            'frames_captured': station.source.frames_captured,
+            'frames_processed': station.frames_processed,
+            'frames_dropped': station.source.frames_dropped,
+            'achieved_fps': station.frames_processed / elapsed if elapsed > 0 else 0.0,
+            'mean_processing_ms': 1000 * station.processing_time / station.frames_processed
+            if station.frames_processed else 0.0,
+            'final_counter': station.session.counter,
+            'blocked': station.session.blocked,
+            'summary': station.session.finish()
+        } for station in stations]
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-src",
+                    "--source",
+                    nargs='+',
+                    action='append',
+                    metavar=('EXERCISE_TYPE', 'SOURCE'),
+                    help='A station: exercise type, webcam index or video path, and optionally '
+                         'user id and registered photo. Repeat for each station',
+                    required=True)
+    ap.add_argument("-sp",
+                    "--schedule",
+                    type=str,
+                    default='deadline',
+                    choices=FairScheduler.POLICIES,
+                    help='How stations share inference time')
+    ap.add_argument("-nd",
+                    "--no_display",
+                    action="store_true",
+                    help='Run without preview windows')
+    ap.add_argument("-o",
+                    "--output",
+                    type=str,
+                    help='Write the per-station report as JSON to this path',
+                    required=False)
+    args = vars(ap.parse_args())
+
+    specs = []
+    for values in args["source"]:
+        if len(values) < 2:
+            ap.error("each --source needs at least an exercise type and a source")
+        spec = {'exercise_type': values[0], 'source': values[1]}
+        if len(values) > 2:
+            spec['user_id'] = values[2]
+        if len(values) > 3:
+            spec['registered_photo'] = values[3]
+        specs.append(spec)
+
+    report = run_multi_source(specs, args["schedule"], display=not args["no_display"])
+
+    for station in report['stations']:
+        print(f"{station['name']} ({station['exercise_type']}): {station['achieved_fps']:.1f} fps achieved / "
+              f"{station['source_fps']:.1f} source, {station['frames_dropped']} dropped, "
+              f"{station['final_counter']} reps")
+        print(station['summary'])
+
+    if args["output"] is not None:
+        with open(args["output"], 'w') as f:
+            json.dump(report, f, indent=2)
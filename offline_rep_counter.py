@@ -0,0 +1,135 @@
+# offline_rep_counter.py
+from typing import Dict
+
+import numpy as np
+
+from utils import mp_pose
+from types_of_exercise import REP_THRESHOLDS
+
+
+def _point(landmark_series: np.ndarray, body_part_name: str) -> np.ndarray:
+    """(N, 2) x, y trajectory of one landmark from an (N, 33, >=2) landmark array"""
+    return landmark_series[:, mp_pose.PoseLandmark[body_part_name].value, :2].astype(np.float64)
+
+
+def _midpoint(landmark_series: np.ndarray, right: str, left: str) -> np.ndarray:
+    return (_point(landmark_series, right) + _point(landmark_series, left)) / 2
+
+
+def calculate_angles(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Vectorized utils.calculate_angle over (N, 2) point arrays"""
+    radians = np.arctan2(c[:, 1] - b[:, 1], c[:, 0] - b[:, 0]) -\
+              np.arctan2(a[:, 1] - b[:, 1], a[:, 0] - b[:, 0])
+    angle = np.abs(radians * 180.0 / np.pi)
+    return np.where(angle > 180.0, 360 - angle, angle)
+
+
+def _limb_angle(landmark_series: np.ndarray, side: str, upper: str, middle: str, lower: str) -> np.ndarray:
+    return calculate_angles(_point(landmark_series, f"{side}_{upper}"),
+                            _point(landmark_series, f"{side}_{middle}"),
+                            _point(landmark_series, f"{side}_{lower}"))
+
+
+def rep_signal(landmark_series: np.ndarray, exercise_type: str) -> np.ndarray:
+    """The per-frame value each TypeOfExercise counter compares with its thresholds.
+
+    landmark_series is an (N, 33, 4) array of x, y, z, visibility per frame, as produced
+    by utils.landmarks_to_array. Pull-ups use the average elbow height minus the nose
+    height, which is negative exactly when the streaming counter sees the nose below
+    the elbows.
+    """
+    if exercise_type == "push-up":
+        left_arm = _limb_angle(landmark_series, "LEFT", "SHOULDER", "ELBOW", "WRIST")
+        return (left_arm + left_arm) // 2  # push_up averages the left arm with itself
+    elif exercise_type == "squat":
+        right_leg = _limb_angle(landmark_series, "RIGHT", "HIP", "KNEE", "ANKLE")
+        left_leg = _limb_angle(landmark_series, "LEFT", "HIP", "KNEE", "ANKLE")
+        return (right_leg + left_leg) // 2
+    elif exercise_type == "sit-up":
+        return calculate_angles(_midpoint(landmark_series, "RIGHT_SHOULDER", "LEFT_SHOULDER"),
+                                _midpoint(landmark_series, "RIGHT_HIP", "LEFT_HIP"),
+                                _midpoint(landmark_series, "RIGHT_KNEE", "LEFT_KNEE"))
+    elif exercise_type == "pull-up":
+        nose_y = landmark_series[:, mp_pose.PoseLandmark.NOSE.value, 1].astype(np.float64)
+        elbow_y = (landmark_series[:, mp_pose.PoseLandmark.LEFT_ELBOW.value, 1].astype(np.float64) +
+                   landmark_series[:, mp_pose.PoseLandmark.RIGHT_ELBOW.value, 1].astype(np.float64)) / 2
+        return elbow_y - nose_y
+    raise ValueError(f"No offline counter for exercise type '{exercise_type}'")
+
+
+def rep_thresholds(exercise_type: str):
+    """(down, up) thresholds matching the streaming counter for exercise_type"""
+    if exercise_type == "pull-up":
+        return 0.0, 0.0
+    return REP_THRESHOLDS[exercise_type]
+
+
+def hysteresis_states(signal: np.ndarray, down: float, up: float, status: bool = True) -> np.ndarray:
+    """Per-frame status of the up/down state machine, computed without a Python loop.
+
+    A frame below `down` forces the down state, a frame above `up` forces the up state,
+    and anything in between keeps the last forced state (or the initial status).
+    """
+    marks = np.zeros(signal.shape, dtype=np.int8)
+    marks[signal < down] = -1
+    marks[signal > up] = 1
+    positions = np.where(marks != 0, np.arange(signal.shape[-1]), -1)
+    last = np.maximum.accumulate(positions, axis=-1)
+    forced = np.take_along_axis(marks, np.maximum(last, 0), axis=-1) > 0
+    return np.where(last >= 0, forced, status)
+
+
+def count_reps(signal: np.ndarray, down: float, up: float, counter: int = 0, status: bool = True,
+               timestamps: np.ndarray = None, fps: float = 30.0) -> Dict:
+    """Count reps over a whole signal with the streaming counters' up/down hysteresis.
+
+    A rep starts on the frame the signal drops below `down` (where the streaming counter
+    increments) and ends on the frame it next rises above `up`. A rep still in progress
+    at the end of the series ends on the last frame and is marked incomplete.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    n = len(signal)
+    states = hysteresis_states(signal, down, up, status)
+    previous = np.concatenate(([status], states[:-1]))
+
+    starts = np.nonzero(previous & ~states)[0]
+    rises = np.nonzero(~previous & states)[0]
+    end_positions = np.searchsorted(rises, starts)
+    completed = end_positions < len(rises)
+    ends = np.full(len(starts), n - 1, dtype=np.intp)
+    ends[completed] = rises[end_positions[completed]]
+
+    if timestamps is None:
+        timestamps = np.arange(n) / fps
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+
+    if len(starts):
+        # Each rep covers frames start..end inclusive; reps never overlap, so one
+        # reduceat over interleaved boundaries gives every rep's extrema at once
+        padded = np.append(signal, signal[-1])
+        boundaries = np.empty(2 * len(starts), dtype=np.intp)
+        boundaries[0::2] = starts
+        boundaries[1::2] = ends + 1
+        min_angles = np.minimum.reduceat(padded, boundaries)[0::2]
+        max_angles = np.maximum.reduceat(padded, boundaries)[0::2]
+    else:
+        min_angles = max_angles = np.empty(0)
+
+    return {
+        'counter': counter + len(starts),
+        'status': bool(states[-1]) if n else status,
+        'rep_starts': starts,
+        'rep_ends': ends,
+        'completed': completed,
+        'durations': timestamps[ends] - timestamps[starts],
+        'min_angles': min_angles,
+        'max_angles': max_angles
+    }
+
+
+def count_exercise_reps(landmark_series: np.ndarray, exercise_type: str, timestamps: np.ndarray = None,
+                        fps: float = 30.0) -> Dict:
+    """Offline equivalent of running TypeOfExercise frame by frame over a recorded session"""
+    down, up = rep_thresholds(exercise_type)
+    return count_reps(rep_signal(landmark_series, exercise_type), down, up,
+                      timestamps=timestamps, fps=fps)
@@ -0,0 +1,196 @@
+# pose_roi.py
+import argparse
+import time
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+from utils import landmarks_to_array
+
+# Landmarks used for the subject's bounding box (face mesh points add nothing but jitter)
+_BODY_LANDMARKS = np.array([0, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32])
+
+# RoiPose settings used by main.py; they change the landmarks, so they're part of the analysis cache fingerprint
+ROI_SETTINGS = {'crop_size': 256, 'padding': 0.3, 'margin': 0.1, 'max_fraction': 0.8, 'min_visibility': 0.5}
+
+
+class RoiPose:
+    """Drop-in wrapper for mp_pose.Pose that runs inference on a crop around the athlete.
+
+    The crop is a padded square around the previous frame's body landmarks, resized to a
+    fixed crop_size before inference; landmarks are mapped back to full-frame normalized
+    coordinates, so callers (BodyPartAngle, drawing) see the same results as with
+    full-frame inference. The crop only moves when the subject gets close to its edge,
+    which keeps MediaPipe's frame-to-frame tracking and smoothing stable. When the
+    subject is lost, or fills most of the frame anyway, the next frame is processed
+    full-frame.
+    """
+
+    def __init__(self, pose, crop_size: int = 256, padding: float = 0.3, margin: float = 0.1,
+                 max_fraction: float = 0.8, min_visibility: float = 0.5):
+        self.pose = pose
+        self.crop_size = crop_size  # pixels of the square image given to pose.process
+        self.padding = padding  # added to each side of the body box, as a fraction of its size
+        self.margin = margin  # re-center once the body comes this close (fraction of crop) to an edge
+        self.max_fraction = max_fraction  # crops covering more of the frame's short side than this aren't worth it
+        self.min_visibility = min_visibility  # mean body landmark visibility to trust the crop
+
+        self.roi = None  # (x0, y0, side) in frame pixels, or None for full-frame
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.retries = 0  # extra inference passes after the input switched between crop and frame
+
+    def process(self, image: np.ndarray):
+        height, width = image.shape[:2]
+        roi = self.roi
+        results = None
+        if roi is not None:
+            x0, y0, side = roi
+            crop = cv2.resize(image[y0:y0 + side, x0:x0 + side], (self.crop_size, self.crop_size),
+                              interpolation=cv2.INTER_AREA)
+            results = self.pose.process(crop)
+            if not results.pose_landmarks:
+                # MediaPipe tracks the pose from the previous image, which was in other
+                # coordinates if the crop just moved; with tracking reset, a second pass
+                # runs a fresh detection on the crop
+                self.retries += 1
+                results = self.pose.process(crop)
+            if results.pose_landmarks:
+                self.roi_frames += 1
+                self._to_frame_coordinates(results.pose_landmarks, roi, width, height)
+            else:
+                roi = None
+        if roi is None:
+            self.full_frames += 1
+            results = self.pose.process(image)
+            if not results.pose_landmarks and self.roi is not None:
+                self.retries += 1
+                results = self.pose.process(image)
+
+        self.roi = self._next_roi(results, roi, width, height)
+        return results
+
+    @staticmethod
+    def _to_frame_coordinates(pose_landmarks, roi: Tuple[int, int, int], width: int, height: int):
+        """Map crop-normalized landmarks in place to full-frame normalized coordinates"""
+        x0, y0, side = roi
+        for landmark in pose_landmarks.landmark:
+            landmark.x = (x0 + landmark.x * side) / width
+            landmark.y = (y0 + landmark.y * side) / height
+            landmark.z = landmark.z * side / width  # z shares the x scale
+
+    def _next_roi(self, results, roi, width: int, height: int):
+        if not results.pose_landmarks:
+            return None  # Subject lost: search the whole frame again
+        body = landmarks_to_array(results.pose_landmarks.landmark)[_BODY_LANDMARKS]
+        if body[:, 3].mean() < self.min_visibility:
+            return None
+
+        xs, ys = body[:, 0] * width, body[:, 1] * height
+        left, right, top, bottom = xs.min(), xs.max(), ys.min(), ys.max()
+
+        # Keep the current crop while the body stays clear of its edges
+        if roi is not None:
+            x0, y0, side = roi
+            inset = self.margin * side
+            if (left >= x0 + inset and right <= x0 + side - inset and
+                    top >= y0 + inset and bottom <= y0 + side - inset):
+                return roi
+
+        side = int(max(right - left, bottom - top) * (1 + 2 * self.padding))
+        if side <= 0 or side > self.max_fraction * min(width, height):
+            return None
+        # Center on the body and shift (not shrink) the square to stay inside the frame
+        x0 = int(np.clip((left + right) / 2 - side / 2, 0, width - side))
+        y0 = int(np.clip((top + bottom) / 2 - side / 2, 0, height - side))
+        return x0, y0, side
+
+    def close(self):
+        self.pose.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def compare_roi(video_path: str, crop_size: int = 256, frame_size=(800, 480)) -> Dict:
+    """Run a video through full-frame and ROI pose inference and compare speed and landmarks.
+
+    Accuracy is measured against the full-frame run: the mean pixel distance of the body
+    landmarks and the mean absolute difference of the knee and elbow angles.
+    """
+    from exercise_session import mp_pose, POSE_SETTINGS
+    from offline_rep_counter import _limb_angle
+
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(cv2.resize(frame, frame_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB))
+    cap.release()
+
+    runs = {}
+    roi_pose = None
+    for mode in ("full_frame", "roi"):
+        landmarks = np.full((len(frames), 33, 4), np.nan, dtype=np.float32)
+        with mp_pose.Pose(**POSE_SETTINGS) as pose:
+            model = RoiPose(pose, crop_size=crop_size) if mode == "roi" else pose
+            start = time.perf_counter()
+            for i, frame in enumerate(frames):
+                results = model.process(frame)
+                if results.pose_landmarks:
+                    landmarks[i] = landmarks_to_array(results.pose_landmarks.landmark)
+            elapsed = time.perf_counter() - start
+        if mode == "roi":
+            roi_pose = model
+        runs[mode] = {'fps': len(frames) / elapsed, 'landmarks': landmarks}
+
+    full, roi = runs['full_frame']['landmarks'], runs['roi']['landmarks']
+    both = ~np.isnan(full[:, 0, 0]) & ~np.isnan(roi[:, 0, 0])
+    scale = np.array(frame_size, dtype=np.float64)
+    distances = np.linalg.norm((full[both][:, _BODY_LANDMARKS, :2] - roi[both][:, _BODY_LANDMARKS, :2]) * scale, axis=-1)
+
+    angle_errors = []
+    for side in ("LEFT", "RIGHT"):
+        for joints in (("HIP", "KNEE", "ANKLE"), ("SHOULDER", "ELBOW", "WRIST")):
+            angle_errors.append(np.abs(_limb_angle(full[both], side, *joints) - _limb_angle(roi[both], side, *joints)))
+
+    return {
+        'frames': len(frames),
+        'full_frame_fps': runs['full_frame']['fps'],
+        'roi_fps': runs['roi']['fps'],
+        'roi_frames': roi_pose.roi_frames,
+        'full_frames': roi_pose.full_frames,
+        'detected_full_frame': int((~np.isnan(full[:, 0, 0])).sum()),
+        'detected_roi': int((~np.isnan(roi[:, 0, 0])).sum()),
+        'mean_landmark_error_px': float(distances.mean()) if both.any() else None,
+        'p90_landmark_error_px': float(np.percentile(distances, 90)) if both.any() else None,
+        'mean_joint_angle_error_deg': float(np.mean(angle_errors)) if both.any() else None
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-vs",
+                    "--video_source",
+                    type=str,
+                    help='Video to compare full-frame and ROI pose inference on',
+                    required=True)
+    ap.add_argument("-c",
+                    "--crop_size",
+                    type=int,
+                    default=256,
+                    help='Side in pixels of the square crop given to the pose model')
+    args = vars(ap.parse_args())
+
+    report = compare_roi(args["video_source"], args["crop_size"])
+    print(f"Frames: {report['frames']} ({report['roi_frames']} on a crop, {report['full_frames']} full-frame)")
+    print(f"FPS: {report['full_frame_fps']:.1f} full-frame / {report['roi_fps']:.1f} ROI")
+    print(f"Pose found: {report['detected_full_frame']} full-frame / {report['detected_roi']} ROI")
+    print(f"Landmark error vs full-frame: mean {report['mean_landmark_error_px']:.1f} px, "
+          f"p90 {report['p90_landmark_error_px']:.1f} px; joint angles {report['mean_joint_angle_error_deg']:.1f} deg")
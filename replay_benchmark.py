@@ -0,0 +1,88 @@
+# replay_benchmark.py
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from cheat_detection_system import ComprehensiveCheatDetector
+
+
+def load_frames(video_path: str, frame_size=(800, 480), limit: int = 300):
+    """Frames resized the way main.py resizes them"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, frame_size, interpolation=cv2.INTER_AREA))
+    cap.release()
+    return frames
+
+
+def _time_per_frame(fn, frames, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for frame in frames:
+            fn(frame)
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best / len(frames)
+
+
+def benchmark_replay_detection(frames, repeats: int = 3) -> dict:
+    """Per-frame cost of the reference and fast replay checks, and whether they agree"""
+    detector = ComprehensiveCheatDetector("benchmark")
+
+    def fast(frame):
+        detector.detect_replay_attack_fast(frame)
+
+    reference_ms = _time_per_frame(detector.detect_replay_attack, frames, repeats)
+    indicators_ms = _time_per_frame(detector._replay_indicators, frames, repeats)
+    fast_ms = _time_per_frame(fast, frames, repeats)
+
+    mismatches = sum(detector._reference_replay_indicators(frame) != detector._replay_indicators(frame)
+                     for frame in frames)
+    return {
+        'frames': len(frames),
+        'reference_ms': reference_ms,
+        'indicators_ms': indicators_ms,
+        'fast_ms': fast_ms,
+        'sample_interval': detector.replay_sample_interval,
+        'indicator_mismatches': mismatches
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-vs",
+                    "--video_source",
+                    type=str,
+                    help='Video to benchmark on (default: generated noise frames)',
+                    required=False)
+    ap.add_argument("-n",
+                    "--frames",
+                    type=int,
+                    default=300,
+                    help='Number of frames to time')
+    ap.add_argument("-r",
+                    "--repeats",
+                    type=int,
+                    default=3,
+                    help='Timing runs; the fastest is reported')
+    args = vars(ap.parse_args())
+
+    if args["video_source"] is not None:
+        frames = load_frames(args["video_source"], limit=args["frames"])
+    else:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (480, 800, 3), dtype=np.uint8) for _ in range(args["frames"])]
+
+    report = benchmark_replay_detection(frames, args["repeats"])
+    print(f"Frames: {report['frames']}")
+    print(f"detect_replay_attack:      {report['reference_ms']:.2f} ms/frame")
+    print(f"_replay_indicators:        {report['indicators_ms']:.2f} ms/frame")
+    print(f"detect_replay_attack_fast: {report['fast_ms']:.2f} ms/frame "
+          f"(sampling every {report['sample_interval']} frames)")
+    print(f"Frames where the indicators differ: {report['indicator_mismatches']}")
@@ -0,0 +1,199 @@
+# session_store.py
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+import logging
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    exercise_type TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    total_reps INTEGER,
+    average_form_score REAL,
+    total_violations INTEGER,
+    session_valid INTEGER
+);
+CREATE TABLE IF NOT EXISTS reps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+    rep_index INTEGER NOT NULL,
+    completed_at REAL NOT NULL,
+    duration REAL,
+    form_score REAL,
+    min_angle REAL,
+    max_angle REAL
+);
+CREATE TABLE IF NOT EXISTS violations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+    occurred_at REAL NOT NULL,
+    violation TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_exercise ON sessions(user_id, exercise_type, started_at);
+CREATE INDEX IF NOT EXISTS idx_reps_session ON reps(session_id, rep_index);
+CREATE INDEX IF NOT EXISTS idx_violations_session ON violations(session_id, occurred_at);
+"""
+
+
+class SessionStore:
+    """SQLite history of sessions, reps and violations, written from a background thread.
+
+    All times are seconds since the epoch; writes without an explicit time use the clock
+    at the moment they are queued.
+    """
+
+    def __init__(self, db_path: str = "sessions.db", batch_size: int = 100, flush_interval: float = 1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # seconds a partial batch may wait before commit
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Create the schema up front so readers never see a missing table
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="session-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, avoids an fsync per commit
+        return conn
+
+    # ---- Writes (non-blocking, called from the frame loop) ----
+
+    def start_session(self, user_id: str, exercise_type: str, started_at: float = None) -> str:
+        """Queue a new session row and return its id"""
+        session_id = uuid.uuid4().hex
+        self._queue.put((
+            "INSERT INTO sessions (session_id, user_id, exercise_type, started_at) VALUES (?, ?, ?, ?)",
+            (session_id, user_id, exercise_type, time.time() if started_at is None else started_at)
+        ))
+        return session_id
+
+    def record_rep(self, session_id: str, rep_index: int, duration: float, form_score: float,
+                   min_angle: float = None, max_angle: float = None, completed_at: float = None):
+        """Queue a completed rep"""
+        self._queue.put((
+            "INSERT INTO reps (session_id, rep_index, completed_at, duration, form_score, min_angle, max_angle) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (session_id, rep_index, time.time() if completed_at is None else completed_at, float(duration), float(form_score),
+             None if min_angle is None else float(min_angle),
+             None if max_angle is None else float(max_angle))
+        ))
+
+    def record_violation(self, session_id: str, violation: str, occurred_at: float = None):
+        """Queue a violation event"""
+        self._queue.put((
+            "INSERT INTO violations (session_id, occurred_at, violation) VALUES (?, ?, ?)",
+            (session_id, time.time() if occurred_at is None else occurred_at, violation)
+        ))
+
+    def end_session(self, session_id: str, total_reps: int, average_form_score: float,
+                    total_violations: int = 0, session_valid: bool = True, ended_at: float = None):
+        """Queue the final session totals"""
+        self._queue.put((
+            "UPDATE sessions SET ended_at = ?, total_reps = ?, average_form_score = ?, "
+            "total_violations = ?, session_valid = ? WHERE session_id = ?",
+            (time.time() if ended_at is None else ended_at, int(total_reps), float(average_form_score),
+             int(total_violations), int(bool(session_valid)), session_id)
+        ))
+
+    def flush(self):
+        """Block until every queued write has been committed"""
+        self._queue.join()
+
+    def close(self):
+        """Commit pending writes and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _writer_loop(self):
+        conn = self._connect()
+        running = True
+        while running:
+            # Wait for the first write, then drain up to a full batch without blocking
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+            statements = [item for item in batch if item is not None]
+            try:
+                with conn:  # One transaction per batch
+                    for sql, params in statements:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to write {len(statements)} session records: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    # ---- Reads ----
+
+    def _query(self, sql: str, params: tuple) -> List[Dict]:
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def get_user_history(self, user_id: str, exercise_type: str = None, limit: int = 50) -> List[Dict]:
+        """Most recent sessions for a user, optionally for one exercise"""
+        if exercise_type is None:
+            return self._query(
+                "SELECT * FROM sessions WHERE user_id = ? ORDER BY started_at DESC LIMIT ?",
+                (user_id, limit)
+            )
+        return self._query(
+            "SELECT * FROM sessions WHERE user_id = ? AND exercise_type = ? ORDER BY started_at DESC LIMIT ?",
+            (user_id, exercise_type, limit)
+        )
+
+    def get_session_reps(self, session_id: str) -> List[Dict]:
+        """All reps of a session in order"""
+        return self._query("SELECT * FROM reps WHERE session_id = ? ORDER BY rep_index", (session_id,))
+
+    def get_session_violations(self, session_id: str) -> List[Dict]:
+        """All violation events of a session in order"""
+        return self._query("SELECT * FROM violations WHERE session_id = ? ORDER BY occurred_at", (session_id,))
+
+    def get_exercise_trend(self, user_id: str, exercise_type: str, limit: int = 100) -> List[Dict]:
+        """Per-session rep count, form and rep duration for a user's exercise, oldest first"""
+        return self._query(
+            """
+            SELECT s.session_id, s.started_at, s.total_reps, s.average_form_score, s.total_violations,
+                   AVG(r.duration) AS average_rep_time,
+                   MIN(r.min_angle) AS min_angle,
+                   MAX(r.max_angle) AS max_angle
+            FROM (SELECT * FROM sessions WHERE user_id = ? AND exercise_type = ?
+                  ORDER BY started_at DESC LIMIT ?) AS s
+            LEFT JOIN reps r ON r.session_id = s.session_id
+            GROUP BY s.session_id
+            ORDER BY s.started_at
+            """,
+            (user_id, exercise_type, limit)
+        )
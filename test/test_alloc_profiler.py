@@ -0,0 +1,39 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from alloc_profiler import AllocationProfiler, run_leak_check
+
+
+def test_unreadable_video_fails(tmp_path):
+    with pytest.raises(IOError):
+        run_leak_check(str(tmp_path / "does_not_exist.mp4"), "squat", minutes=0.05, max_growth_mb=50)
+
+
+def test_report_without_baseline_profiles_nothing():
+    profiler = AllocationProfiler(warmup_frames=100).start()
+    try:
+        for _ in range(10):
+            profiler.tick()
+        report = profiler.report()
+    finally:
+        profiler.stop()
+    assert report['baseline_taken'] is False
+    assert report['frames_profiled'] == 0
+
+
+def test_video_shorter_than_warmup_does_not_pass(tmp_path):
+    pytest.importorskip("face_recognition")
+    pytest.importorskip("mediapipe")
+    path = str(tmp_path / "short.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (160, 120))
+    for _ in range(5):
+        writer.write(np.full((120, 160, 3), 128, np.uint8))
+    writer.release()
+    assert os.path.getsize(path) > 0
+
+    # Each replay of the video is too short to ever reach the warm-up frame count
+    report = run_leak_check(path, "squat", minutes=0.02, max_growth_mb=50, warmup_frames=10 ** 9)
+    assert report['passed'] is False
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from analysis_cache import AnalysisCache
+from pose_roi import ROI_SETTINGS
+
+POSE_SETTINGS = {'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+
+
+def test_pose_roi_settings_change_the_fingerprint():
+    full_frame = AnalysisCache.config_fingerprint(POSE_SETTINGS, (800, 480))
+    roi = AnalysisCache.config_fingerprint(dict(POSE_SETTINGS, pose_roi=ROI_SETTINGS), (800, 480))
+    smaller_crop = AnalysisCache.config_fingerprint(
+        dict(POSE_SETTINGS, pose_roi=dict(ROI_SETTINGS, crop_size=192)), (800, 480))
+    assert len({full_frame, roi, smaller_crop}) == 3
+    assert roi == AnalysisCache.config_fingerprint(dict(POSE_SETTINGS, pose_roi=dict(ROI_SETTINGS)), (800, 480))
+
+
+def test_configurations_keep_separate_entries(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"not really a video")
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    full_frame = AnalysisCache.config_fingerprint(POSE_SETTINGS, (800, 480))
+    roi = AnalysisCache.config_fingerprint(dict(POSE_SETTINGS, pose_roi=ROI_SETTINGS), (800, 480))
+
+    landmarks = np.zeros((2, 33, 4), dtype=np.float32)
+    cache.store(str(video), full_frame, landmarks, [{'frame': 0}, {'frame': 1}])
+    assert cache.load(str(video), roi) is None
+    cache.store(str(video), roi, landmarks + 1, [{'frame': 0}, {'frame': 1}])
+
+    # Alternating configurations hit both entries
+    for _ in range(2):
+        assert cache.load(str(video), full_frame)['landmarks'].max() == 0
+        assert cache.load(str(video), roi)['landmarks'].max() == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    videos = []
+    for index in range(3):
+        video = tmp_path / f"video{index}.mp4"
+        video.write_bytes(f"video {index}".encode())
+        videos.append(str(video))
+    fingerprint = AnalysisCache.config_fingerprint(POSE_SETTINGS, (800, 480))
+    landmarks = np.zeros((100, 33, 4), dtype=np.float32)
+
+    cache.store(videos[0], fingerprint, landmarks, [{}] * 100)
+    entry_size = sum(os.path.getsize(os.path.join(cache.cache_dir, name)) for name in os.listdir(cache.cache_dir))
+    cache.max_bytes = 2 * entry_size
+    cache.store(videos[1], fingerprint, landmarks, [{}] * 100)
+    os.utime(cache._entry_path(videos[0], fingerprint), (0, 0))  # Make video 0 the oldest
+    cache.store(videos[2], fingerprint, landmarks, [{}] * 100)
+
+    assert cache.load(videos[0], fingerprint) is None
+    assert cache.load(videos[1], fingerprint) is not None
+    assert cache.load(videos[2], fingerprint) is not None
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("face_recognition")
+
+from bulk_enrollment import bulk_enroll, find_duplicates, load_encoding_store
+
+
+def test_all_photos_rejected(tmp_path):
+    photo = str(tmp_path / "nobody.png")
+    cv2.imwrite(photo, np.full((120, 160, 3), 200, np.uint8))
+    store_path = str(tmp_path / "store" / "encodings.pkl")
+
+    report = bulk_enroll([("nobody", photo)], store_path, workers=1)
+
+    assert report['total'] == 1 and report['enrolled'] == 0
+    assert [r['user_id'] for r in report['rejected']] == ["nobody"]
+    assert load_encoding_store(store_path) == {}
+
+
+def test_find_duplicates():
+    rng = np.random.default_rng(0)
+    encodings = rng.normal(0, 1, (6, 128))
+    encodings[3] = encodings[0] + 0.001  # another user with user a's face
+    encodings[4] = encodings[1] + 0.001  # user b enrolled twice is not a duplicate
+    encodings[5] = encodings[3] + 0.001  # close to a and d; d is itself rejected, so a is reported
+    user_ids = ["a", "b", "c", "d", "b", "e"]
+
+    for block_size in (1, 2, 256):
+        assert find_duplicates(user_ids, encodings, 0.35, block_size) == {3: 0, 5: 0}
+
+
+def test_find_duplicates_blocks_match_dense_distances():
+    rng = np.random.default_rng(1)
+    encodings = rng.normal(0, 0.05, (300, 128))
+    user_ids = [str(i) for i in range(300)]
+    dense = np.linalg.norm(encodings[:, None] - encodings[None, :], axis=-1)
+    threshold = float(np.percentile(dense[np.triu_indices(300, 1)], 1))
+
+    expected = {}
+    for i in range(1, 300):
+        for j in np.nonzero(dense[i, :i] <= threshold)[0]:
+            if j not in expected:
+                expected[i] = int(j)
+                break
+    assert expected
+    assert find_duplicates(user_ids, encodings, threshold, block_size=64) == expected
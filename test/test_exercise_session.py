@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("face_recognition")
+
+from analysis_cache import AnalysisRecorder, CachedPoseResult, landmark_list_from_array
+from cheat_detection_system import ComprehensiveCheatDetector
+from exercise_session import ExerciseSession
+from motion_gate import MotionGate
+from session_store import SessionStore
+
+FACE = {'location': (100, 300, 250, 150), 'encoding': np.zeros(128), 'center': (225, 175), 'size': 150 * 150}
+
+
+class FakePose:
+    """Pose stand-in that finds the same standing body in every frame"""
+
+    def __init__(self):
+        landmarks = np.random.default_rng(0).uniform(0.2, 0.8, (33, 4)).astype(np.float32)
+        landmarks[:, 3] = 1.0
+        self.landmarks = landmarks
+
+    def process(self, image):
+        return CachedPoseResult(landmark_list_from_array(self.landmarks))
+
+
+def gated_session(monkeypatch, faces, **session_args):
+    detector = ComprehensiveCheatDetector("test_user")
+    detector.processed = 0
+    process_frame = detector.process_frame
+
+    def counting_process_frame(frame):
+        detector.processed += 1
+        return process_frame(frame)
+
+    monkeypatch.setattr(detector, "process_frame", counting_process_frame)
+    monkeypatch.setattr(detector, "detect_faces_two_tier", lambda frame: [dict(face) for face in faces])
+    monkeypatch.setattr(detector, "analyze_lighting_quality", lambda frame: (True, "Good lighting conditions"))
+    monkeypatch.setattr(detector, "detect_replay_attack_fast", lambda frame: (False, 0.0))
+    session = ExerciseSession("squat", FakePose(), detector, motion_gate=MotionGate(),
+                              show_score_table=False, verbose=False, **session_args)
+    return session, detector
+
+
+STATIC_FRAME = np.random.default_rng(1).integers(0, 256, (480, 800, 3), dtype=np.uint8)
+
+
+def test_static_frames_with_a_face_are_skipped(monkeypatch):
+    session, detector = gated_session(monkeypatch, [FACE])
+    gate = session.motion_gate
+    frames = 3 * (gate.max_stale_frames + 1)
+    for _ in range(frames):
+        session.process(STATIC_FRAME)
+    # One full evaluation, then max_stale_frames reused frames, and so on
+    assert detector.processed == frames // (gate.max_stale_frames + 1)
+
+
+def test_no_face_timer_is_not_slowed_by_the_gate(monkeypatch):
+    session, detector = gated_session(monkeypatch, [])
+    for _ in range(detector.max_no_face_frames + 1):
+        session.process(STATIC_FRAME)
+    assert detector.processed == detector.max_no_face_frames + 1
+    assert detector.violation_counts['no_face_detected'] == 1
+    assert "No face detected for extended period" in session.detection_results.violations
+
+
+def test_violations_are_stored_at_the_frame_time(monkeypatch, tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), flush_interval=0.05)
+    session_id = store.start_session("test_user", "squat")
+    session, detector = gated_session(monkeypatch, [], session_store=store, session_id=session_id)
+    try:
+        # Video timestamps starting 100 s into the file, processed much faster than real time
+        for index in range(detector.max_no_face_frames + 1):
+            session.process(STATIC_FRAME, 100.0 + index / 30)
+        store.flush()
+        violations = store.get_session_violations(session_id)
+    finally:
+        store.close()
+    assert len(violations) == 1
+    assert violations[0]['occurred_at'] - session.clock_offset == pytest.approx(100.0 + detector.max_no_face_frames / 30)
+
+
+def test_motion_gate_runs_do_not_record_analysis():
+    # Gate-skipped frames have no pose or verdict of their own to put in the cache
+    with pytest.raises(ValueError):
+        ExerciseSession("squat", pose=None, cheat_detector=None, motion_gate=MotionGate(),
+                        analysis_recorder=AnalysisRecorder())
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("face_recognition")
+
+import cheat_detection_system
+from cheat_detection_system import ComprehensiveCheatDetector
+
+FRAME = np.full((480, 800, 3), 128, np.uint8)
+USER_FACE = {'location': (100, 300, 250, 150), 'encoding': np.zeros(128),
+             'center': (225, 175), 'size': 150 * 150}
+
+
+class FakeCascade:
+    """Haar stand-in returning fixed (x, y, w, h) boxes on the downscaled frame"""
+
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+    def detectMultiScale(self, gray, **kwargs):
+        return np.array(self.boxes, dtype=np.int32).reshape(-1, 4)
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    detector = ComprehensiveCheatDetector("test_user")
+    detector.confirm_calls = 0
+
+    def confirmed_faces(frame):
+        detector.confirm_calls += 1
+        return [dict(USER_FACE)]
+
+    monkeypatch.setattr(detector, "detect_faces_in_frame", confirmed_faces)
+    monkeypatch.setattr(cheat_detection_system.face_recognition, "face_encodings",
+                        lambda frame, locations: [np.zeros(128) for _ in locations])
+    return detector
+
+
+def test_haar_false_positive_is_not_a_multiple_face_violation(detector):
+    detector.face_cascade = FakeCascade([(75, 50, 75, 75), (300, 40, 60, 60)])  # user + poster
+    for _ in range(10):
+        verdict = detector.process_frame(FRAME.copy())
+        assert "Multiple faces detected" not in verdict.violations
+    assert detector.violation_counts['multiple_faces'] == 0
+    assert detector.session_active
+
+
+def test_haar_miss_is_not_a_no_face_frame(detector):
+    detector.face_cascade = FakeCascade([])  # turned face, Haar finds nothing
+    for _ in range(detector.max_no_face_frames + 5):
+        detector.process_frame(FRAME.copy())
+    assert detector.no_face_frame_count == 0
+    assert detector.violation_counts['no_face_detected'] == 0
+
+
+def test_agreeing_haar_count_is_reconfirmed_periodically(detector):
+    detector.face_cascade = FakeCascade([(75, 50, 75, 75)])
+    frames = 3 * detector.face_confirm_interval
+    for _ in range(frames):
+        faces = detector.detect_faces_two_tier(FRAME)
+        assert len(faces) == 1
+    # First frame plus one re-confirmation per interval; everything else on Haar boxes
+    assert detector.confirm_calls == frames // detector.face_confirm_interval
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import warnings
+
+import numpy as np
+
+from frame_ring import SharedFrameRing
+
+SHAPE = (4, 6, 3)
+
+
+def frame(value: int) -> np.ndarray:
+    return np.full(SHAPE, value, np.uint8)
+
+
+def test_write_read_release_in_the_creating_process():
+    ring = SharedFrameRing.create(slots=3, readers=1, frame_shape=SHAPE)
+    reader = SharedFrameRing.attach(ring.name, reader_index=0)
+    try:
+        landmarks = np.arange(33 * 4, dtype=np.float32).reshape(33, 4)
+        assert ring.try_write(frame(1), landmarks, timestamp=1.5) == 1
+        frame_slot = reader.read(timeout=1.0)
+        assert frame_slot.seq == 1 and frame_slot.timestamp == 1.5
+        assert np.array_equal(frame_slot.frame, frame(1))
+        assert np.array_equal(frame_slot.landmarks, landmarks)
+        reader.release(frame_slot)
+
+        # Without landmarks the slot holds NaN; the ring refuses to overwrite unread frames
+        for value in (2, 3, 4):
+            assert ring.try_write(frame(value))
+        assert ring.try_write(frame(5)) == 0
+        assert np.isnan(reader.read(timeout=1.0).landmarks).all()
+
+        # latest=True skips to the newest frame and frees the skipped slots
+        frame_slot = reader.read(timeout=1.0, latest=True)
+        assert frame_slot.seq == 4 and frame_slot.frame[0, 0, 0] == 4
+        reader.release(frame_slot)
+        assert ring.try_write(frame(5)) == 5
+
+        ring.close_stream()
+        reader.release(reader.read(timeout=1.0))
+        assert reader.read(timeout=1.0) is None
+    finally:
+        reader.close()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            ring.close()  # Unlinks; fails if attach() dropped the creator's registration
+
+
+def test_attach_in_the_creating_process_keeps_its_registration():
+    # The resource tracker runs in its own process, so its errors only show on stderr
+    script = ("from frame_ring import SharedFrameRing\n"
+              "ring = SharedFrameRing.create(slots=2, frame_shape=(2, 2, 3))\n"
+              "SharedFrameRing.attach(ring.name, reader_index=0).close()\n"
+              "ring.close()\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True,
+                               timeout=60)
+    assert completed.returncode == 0
+    assert "KeyError" not in completed.stderr and "leaked" not in completed.stderr
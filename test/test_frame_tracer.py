@@ -0,0 +1,30 @@
+import json
+
+from frame_tracer import FrameTracer
+
+
+def test_spans_are_complete_events(tmp_path):
+    tracer = FrameTracer()
+    tracer.enable(str(tmp_path / "trace.json"))
+    with tracer.span("frame", frame_index=1):
+        with tracer.span("pose"):
+            pass
+    tracer.instant("dropped_frame")
+
+    with open(tracer.flush()) as f:
+        events = [event for event in json.load(f)['traceEvents'] if event['ph'] != 'M']
+    assert [event['ph'] for event in events] == ['X', 'X', 'i']
+    pose, frame = events[0], events[1]
+    assert (pose['name'], frame['name']) == ('pose', 'frame')
+    assert frame['args'] == {'frame_index': 1}
+    assert frame['ts'] <= pose['ts'] and pose['ts'] + pose['dur'] <= frame['ts'] + frame['dur']
+
+
+def test_full_buffer_keeps_whole_spans(tmp_path):
+    tracer = FrameTracer()
+    tracer.enable(str(tmp_path / "trace.json"), max_events=5)
+    for index in range(20):
+        with tracer.span("frame", frame_index=index):
+            pass
+    assert [event['args']['frame_index'] for event in tracer.events] == list(range(15, 20))
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in tracer.events)
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("flask")
+
+from live_view import LiveView
+
+
+def test_listens_on_localhost_by_default():
+    assert LiveView().host == "127.0.0.1"
+
+
+def test_token_is_required_when_set():
+    client = LiveView(token="s3cret").app.test_client()
+    assert client.get("/").status_code == 403
+    assert client.get("/?token=wrong").status_code == 403
+    page = client.get("/?token=s3cret")
+    assert page.status_code == 200
+    assert b'src="/stream?token=s3cret"' in page.data
+    assert client.get("/stream").status_code == 403
+
+
+def test_no_token_needed_by_default():
+    assert LiveView().app.test_client().get("/").status_code == 200
@@ -0,0 +1,40 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("face_recognition")
+
+from multi_source import FrameSource
+
+
+class SlowCapture:
+    """Capture stand-in whose read() takes a while; release() must not overlap a read"""
+
+    def __init__(self):
+        self.reading = False
+        self.released_during_read = False
+        self.released = False
+
+    def get(self, prop_id):
+        return 30.0
+
+    def read(self):
+        self.reading = True
+        time.sleep(0.05)
+        self.reading = False
+        return not self.released, object()
+
+    def release(self):
+        self.released_during_read = self.reading
+        self.released = True
+
+
+def test_stop_releases_the_capture_after_the_reader_exits():
+    capture = SlowCapture()
+    source = FrameSource(capture, threading.Condition()).start()
+    time.sleep(0.12)
+    source.stop()
+    assert capture.released
+    assert not capture.released_during_read
+    assert source.frames_captured >= 1
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from offline_rep_counter import count_exercise_reps, count_reps, rep_signal, rep_thresholds
+from types_of_exercise import TypeOfExercise
+from utils import mp_pose
+
+EXERCISES = ("push-up", "squat", "sit-up", "pull-up")
+
+
+def random_walk_landmarks(frames: int, seed: int) -> np.ndarray:
+    """(frames, 33, 4) float32 landmarks drifting around the frame, so every joint angle
+    sweeps back and forth across the rep thresholds"""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 0.04, (frames, 33, 2))
+    xy = np.clip(rng.random((33, 2)) + np.cumsum(steps, axis=0), 0, 1)
+    landmarks = np.zeros((frames, 33, 4), dtype=np.float32)
+    landmarks[..., :2] = xy
+    landmarks[..., 3] = 1.0
+    return landmarks
+
+
+def as_landmark_list(frame_landmarks: np.ndarray):
+    """Per-landmark objects with the x, y, z, visibility attributes TypeOfExercise reads"""
+    return [SimpleNamespace(x=float(x), y=float(y), z=float(z), visibility=float(v))
+            for x, y, z, v in frame_landmarks]
+
+
+def stream_counts(landmarks: np.ndarray, exercise_type: str):
+    """Run the streaming counter frame by frame; return (counter, status, rep start frames)"""
+    counter, status, starts = 0, True, []
+    for index, frame_landmarks in enumerate(landmarks):
+        previous = counter
+        counter, status = TypeOfExercise(as_landmark_list(frame_landmarks)).calculate_exercise(
+            exercise_type, counter, status)
+        if counter != previous:
+            starts.append(index)
+    return counter, status, starts
+
+
+@pytest.mark.parametrize("exercise_type", EXERCISES)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_offline_counter_matches_streaming(exercise_type, seed):
+    landmarks = random_walk_landmarks(400, seed)
+    counter, status, starts = stream_counts(landmarks, exercise_type)
+
+    offline = count_exercise_reps(landmarks, exercise_type)
+    assert counter > 0, "generated landmarks never complete a rep"
+    assert offline['counter'] == counter
+    assert offline['status'] == status
+    assert offline['rep_starts'].tolist() == starts
+
+
+def test_empty_signal():
+    down, up = rep_thresholds("squat")
+    result = count_reps(np.empty(0), down, up, counter=4, status=False)
+    assert result['counter'] == 4
+    assert result['status'] is False
+    for key in ('rep_starts', 'rep_ends', 'completed', 'durations', 'min_angles', 'max_angles'):
+        assert len(result[key]) == 0
+
+    result = count_exercise_reps(np.zeros((0, 33, 4), dtype=np.float32), "push-up")
+    assert result['counter'] == 0 and result['status'] is True
+
+
+def test_pull_up_sign_convention():
+    nose, left_elbow, right_elbow = (mp_pose.PoseLandmark[name].value
+                                     for name in ("NOSE", "LEFT_ELBOW", "RIGHT_ELBOW"))
+    # Nose above the elbows, level with them (no change either way), below them (rep),
+    # level again, then back above (ready for the next rep)
+    nose_y = np.array([0.3, 0.5, 0.7, 0.5, 0.3, 0.6], dtype=np.float32)
+    landmarks = np.zeros((len(nose_y), 33, 4), dtype=np.float32)
+    landmarks[:, nose, 1] = nose_y
+    landmarks[:, left_elbow, 1] = 0.25
+    landmarks[:, right_elbow, 1] = 0.75
+
+    signal = rep_signal(landmarks, "pull-up")
+    assert np.all(signal[nose_y < 0.5] > 0) and np.all(signal[nose_y > 0.5] < 0)
+    assert np.all(signal[nose_y == 0.5] == 0)
+
+    offline = count_exercise_reps(landmarks, "pull-up")
+    assert offline['rep_starts'].tolist() == [2, 5]
+    assert (offline['counter'], offline['status'], offline['rep_starts'].tolist()) == \
+        stream_counts(landmarks, "pull-up")
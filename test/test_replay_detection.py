@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("face_recognition")
+
+from cheat_detection_system import ComprehensiveCheatDetector
+
+INDICATORS = ("bright", "edges", "blue", "rectangles", "moire")
+
+
+def random_frame(rng: np.random.Generator) -> np.ndarray:
+    """Flat background with outlined and filled rectangles and some sensor noise"""
+    background = rng.integers(200, 256, 3) if rng.random() < 0.2 else rng.integers(0, 256, 3)
+    frame = np.full((480, 800, 3), background, np.uint8)
+    if rng.random() < 0.25:
+        # A grid of separate screen-like borders
+        for x in range(20, 800 - 180, 190):
+            color = tuple(int(v) for v in rng.integers(0, 256, 3))
+            cv2.rectangle(frame, (x, int(rng.integers(20, 120))), (x + 170, int(rng.integers(300, 460))), color, 3)
+    for _ in range(rng.integers(0, 8)):
+        x, y = int(rng.integers(0, 700)), int(rng.integers(0, 400))
+        w, h = int(rng.integers(60, 400)), int(rng.integers(60, 300))
+        color = tuple(int(v) for v in rng.integers(0, 256, 3))
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, int(rng.choice([-1, 2, 4])))
+    sigma = rng.choice([0, 5, 20, 60])
+    return np.clip(frame + rng.normal(0, sigma, frame.shape), 0, 255).astype(np.uint8)
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return ComprehensiveCheatDetector("test_user")
+
+
+@pytest.fixture(scope="module")
+def frames():
+    rng = np.random.default_rng(0)
+    return [random_frame(rng) for _ in range(120)]
+
+
+def test_fast_indicators_match_reference(detector, frames):
+    reference = np.array([detector._reference_replay_indicators(frame) for frame in frames])
+    fast = np.array([detector._replay_indicators(frame) for frame in frames])
+
+    # Every indicator must actually change across the frames, or agreement proves nothing
+    for column, name in enumerate(INDICATORS):
+        assert 0 < reference[:, column].sum() < len(frames), f"{name} never changes"
+        mismatches = np.flatnonzero(reference[:, column] != fast[:, column])
+        assert mismatches.size == 0, f"{name} differs on frames {mismatches.tolist()}"
+
+
+def test_unsampled_fast_verdict_matches_reference(frames):
+    detector = ComprehensiveCheatDetector("test_user")
+    detector.replay_sample_interval = 1
+    detector.replay_window = type(detector.replay_window)(maxlen=1)
+
+    for frame in frames:
+        is_replay, confidence = detector.detect_replay_attack(frame)
+        assert detector.detect_replay_attack_fast(frame) == (is_replay, pytest.approx(confidence))
+
+
+def test_high_frequency_energy_matches_full_spectrum():
+    rng = np.random.default_rng(1)
+    for height, width in ((480, 800), (481, 799), (7, 5)):
+        gray = rng.integers(0, 256, (height, width), dtype=np.uint8)
+        magnitude = np.abs(np.fft.fft2(gray))
+        expected = magnitude[height // 4:, :].sum() / magnitude.sum()
+        assert ComprehensiveCheatDetector._high_frequency_energy(gray) == pytest.approx(expected, rel=1e-9)
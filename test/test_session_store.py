@@ -0,0 +1,47 @@
+import pytest
+
+from session_store import SessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), flush_interval=0.05)
+    yield store
+    store.close()
+
+
+def test_round_trip(store):
+    first = store.start_session("user", "squat", started_at=0.0)
+    store.record_rep(first, 1, duration=2.0, form_score=80, min_angle=65, max_angle=170, completed_at=0.0)
+    store.record_rep(first, 2, duration=3.0, form_score=90, min_angle=60, max_angle=165, completed_at=5.0)
+    store.record_violation(first, "Multiple faces detected", occurred_at=4.0)
+    store.end_session(first, total_reps=2, average_form_score=85, total_violations=1, ended_at=10.0)
+
+    second = store.start_session("user", "squat", started_at=100.0)
+    store.end_session(second, total_reps=0, average_form_score=0, ended_at=110.0)
+    store.start_session("user", "push-up", started_at=200.0)
+    store.flush()
+
+    history = store.get_user_history("user", "squat")
+    assert [row['session_id'] for row in history] == [second, first]
+    assert history[1]['started_at'] == 0.0 and history[1]['ended_at'] == 10.0
+    assert len(store.get_user_history("user")) == 3
+
+    reps = store.get_session_reps(first)
+    assert [(row['rep_index'], row['completed_at'], row['duration']) for row in reps] == [(1, 0.0, 2.0), (2, 5.0, 3.0)]
+    violations = store.get_session_violations(first)
+    assert [(row['occurred_at'], row['violation']) for row in violations] == [(4.0, "Multiple faces detected")]
+
+    trend = store.get_exercise_trend("user", "squat")
+    assert [row['session_id'] for row in trend] == [first, second]
+    assert trend[0]['average_rep_time'] == 2.5
+    assert (trend[0]['min_angle'], trend[0]['max_angle']) == (60, 170)
+    assert trend[1]['average_rep_time'] is None
+
+
+def test_default_times_use_the_clock(store):
+    session_id = store.start_session("user", "squat")
+    store.record_violation(session_id, "No face detected for extended period")
+    store.flush()
+    assert store.get_user_history("user")[0]['started_at'] > 0
+    assert store.get_session_violations(session_id)[0]['occurred_at'] > 0
@@ -0,0 +1,34 @@
+import numpy as np
+
+from offline_rep_counter import count_reps, rep_signal
+from threshold_sweep import count_reps_grid, sweep_thresholds, threshold_grid
+
+
+def random_walk_landmarks(frames: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    landmarks = np.zeros((frames, 33, 4), dtype=np.float32)
+    landmarks[..., :2] = np.clip(rng.random((33, 2)) + np.cumsum(rng.normal(0, 0.04, (frames, 33, 2)), axis=0), 0, 1)
+    landmarks[..., 3] = 1.0
+    return landmarks
+
+
+def test_grid_counts_match_the_offline_counter():
+    signal = rep_signal(random_walk_landmarks(500, 0), "squat")
+    grid = threshold_grid(np.arange(40, 101, 10), np.arange(100, 176, 15))
+    expected = [count_reps(signal, down, up)['counter'] for down, up in grid]
+    assert count_reps_grid(signal, grid).tolist() == expected
+
+
+def test_pull_up_sessions_are_not_swept_on_a_degree_grid(tmp_path):
+    sessions = []
+    for exercise_type, seed in (("squat", 1), ("pull-up", 2)):
+        path = str(tmp_path / f"{exercise_type}.npy")
+        np.save(path, random_walk_landmarks(300, seed))
+        sessions.append((path, exercise_type, 3))
+
+    report = sweep_thresholds(sessions, np.arange(40, 101, 5), np.arange(100, 176, 5), workers=1)
+
+    assert report['total'] == 2
+    assert list(report['exercises']) == ["squat"]
+    assert report['exercises']['squat']['current']['exact'] is not None
+    assert [failure['session'] for failure in report['failed']] == [sessions[1][0]]
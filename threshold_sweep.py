@@ -0,0 +1,218 @@
+# threshold_sweep.py
+import argparse
+import csv
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+import logging
+
+import numpy as np
+
+from offline_rep_counter import rep_signal
+from types_of_exercise import REP_THRESHOLDS
+
+
+def collect_labelled_sessions(source: str) -> List[Tuple[str, str, int]]:
+    """Read (landmark_path, exercise_type, true_reps) rows from a CSV file.
+
+    Rows are ``session,exercise_type,true_reps`` (a header row is allowed); relative
+    session paths are resolved against the CSV's directory. A session is either an
+    ``.npy`` array of shape (N, 33, 4) as produced by utils.landmarks_to_array, or an
+    analysis cache entry (``.pkl``) written by AnalysisCache.
+    """
+    sessions = []
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or row[0].strip().lower() == 'session':
+                continue
+            path, exercise_type, true_reps = row[0].strip(), row[1].strip(), int(row[2])
+            sessions.append((path if os.path.isabs(path) else os.path.join(base_dir, path),
+                             exercise_type, true_reps))
+    return sessions
+
+
+def load_landmarks(path: str) -> np.ndarray:
+    """(N, 33, 4) landmarks of one recorded session, without the frames where no pose was found"""
+    if path.endswith('.pkl'):
+        with open(path, 'rb') as f:
+            landmarks = pickle.load(f)['landmarks']
+    else:
+        landmarks = np.load(path)
+    # The streaming counters only update on frames with a pose
+    return landmarks[~np.isnan(landmarks[:, 0, 0])]
+
+
+def threshold_grid(downs: np.ndarray, ups: np.ndarray) -> np.ndarray:
+    """(K, 2) array of every (down, up) combination with down <= up"""
+    down, up = np.meshgrid(np.asarray(downs, dtype=np.float64), np.asarray(ups, dtype=np.float64),
+                           indexing='ij')
+    grid = np.stack([down.ravel(), up.ravel()], axis=1)
+    return grid[grid[:, 0] <= grid[:, 1]]
+
+
+def count_reps_grid(signal: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Rep count for every threshold pair in grid, as the streaming counter would produce.
+
+    The counter starts up, so a rep starts at the first frame below `down`, and after that
+    at each frame below `down` whose previous below-`down` frame is separated from it by a
+    frame above `up`. For one down threshold that only needs the peak of the signal in
+    each gap between below-`down` frames; every up threshold is then a binary search over
+    the sorted gap peaks.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    counts = np.zeros(len(grid), dtype=np.int64)
+    for down in np.unique(grid[:, 0]):
+        rows = np.nonzero(grid[:, 0] == down)[0]
+        below = np.flatnonzero(signal < down)
+        if len(below) == 0:
+            continue
+        gaps = np.nonzero(np.diff(below) > 1)[0]
+        if len(gaps):
+            # Peak of signal[below[g] + 1:below[g + 1]] for every gap g
+            boundaries = np.empty(2 * len(gaps), dtype=np.intp)
+            boundaries[0::2] = below[gaps] + 1
+            boundaries[1::2] = below[gaps + 1]
+            peaks = np.sort(np.maximum.reduceat(signal, boundaries)[0::2])
+        else:
+            peaks = np.empty(0)
+        counts[rows] = 1 + len(peaks) - np.searchsorted(peaks, grid[rows, 1], side='right')
+    return counts
+
+
+def sweep_session(task: Tuple[str, str, np.ndarray]) -> Dict:
+    """Worker: rep counts of one session for every threshold pair in the grid"""
+    path, exercise_type, grid = task
+    result = {'session': path, 'counts': None, 'error': None}
+    try:
+        signal = rep_signal(load_landmarks(path), exercise_type)
+        result['counts'] = count_reps_grid(signal, grid)
+    except Exception as e:
+        result['error'] = f"Could not evaluate session: {str(e)}"
+    return result
+
+
+def sweep_thresholds(sessions: List[Tuple[str, str, int]], downs: np.ndarray, ups: np.ndarray,
+                     workers: int = None) -> Dict:
+    """Count accuracy of every (down, up) threshold pair, per exercise type.
+
+    Sessions are evaluated in parallel; within a session all up thresholds that share a
+    down threshold are evaluated at once (see count_reps_grid). Only exercises with angle
+    thresholds (REP_THRESHOLDS) can be swept; other sessions, e.g. pull-ups, which count
+    the nose crossing the elbows, are reported as failed.
+    """
+    logger = logging.getLogger(__name__)
+    grid = threshold_grid(downs, ups)
+
+    failed = [{'session': path, 'reason': f"No angle thresholds to sweep for {exercise_type}"}
+              for path, exercise_type, _ in sessions if exercise_type not in REP_THRESHOLDS]
+    total = len(sessions)
+    sessions = [session for session in sessions if session[1] in REP_THRESHOLDS]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(sweep_session, [(path, exercise_type, grid)
+                                                for path, exercise_type, _ in sessions]))
+
+    failed += [{'session': r['session'], 'reason': r['error']} for r in results if r['error']]
+    by_exercise = {}
+    for (path, exercise_type, true_reps), result in zip(sessions, results):
+        if result['error'] is None:
+            by_exercise.setdefault(exercise_type, []).append((result['counts'], true_reps))
+
+    report = {'total': total, 'failed': failed, 'exercises': {}}
+    for exercise_type, rows in by_exercise.items():
+        counts = np.stack([counts for counts, _ in rows])  # (sessions, K)
+        truth = np.array([true_reps for _, true_reps in rows])[:, None]
+        errors = np.abs(counts - truth)
+        exact = (errors == 0).mean(axis=0)
+        mean_error = errors.mean(axis=0)
+        # Best configurations first: most exact counts, then smallest average miscount
+        order = np.lexsort((mean_error, -exact))
+
+        down, up = REP_THRESHOLDS[exercise_type]
+        current = np.nonzero((grid[:, 0] == down) & (grid[:, 1] == up))[0]
+        report['exercises'][exercise_type] = {
+            'sessions': len(rows),
+            'current': {'down': down, 'up': up,
+                        'exact': float(exact[current[0]]) if len(current) else None,
+                        'mean_abs_error': float(mean_error[current[0]]) if len(current) else None},
+            'configurations': [{'down': float(grid[k, 0]), 'up': float(grid[k, 1]),
+                                'exact': float(exact[k]), 'mean_abs_error': float(mean_error[k])}
+                               for k in order]
+        }
+        logger.info(f"Evaluated {len(grid)} threshold pairs over {len(rows)} {exercise_type} sessions")
+    return report
+
+
+def parse_range(spec: str) -> np.ndarray:
+    """'start:stop:step' (stop inclusive) or a comma-separated list of values"""
+    if ':' in spec:
+        start, stop, step = (float(part) for part in spec.split(':'))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(value) for value in spec.split(',')])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-i",
+                    "--input",
+                    type=str,
+                    help='CSV of session,exercise_type,true_reps rows',
+                    required=True)
+    ap.add_argument("-d",
+                    "--down",
+                    type=str,
+                    default="40:100:5",
+                    help='Down thresholds to try, as start:stop:step or a comma-separated list')
+    ap.add_argument("-u",
+                    "--up",
+                    type=str,
+                    default="100:175:5",
+                    help='Up thresholds to try, as start:stop:step or a comma-separated list')
+    ap.add_argument("-t",
+                    "--exercise_type",
+                    type=str,
+                    help='Only sweep sessions of this exercise type',
+                    required=False)
+    ap.add_argument("-w",
+                    "--workers",
+                    type=int,
+                    help='Number of worker processes (default: CPU count)')
+    ap.add_argument("-k",
+                    "--top",
+                    type=int,
+                    default=5,
+                    help='Number of best configurations to print per exercise type')
+    ap.add_argument("-r",
+                    "--report",
+                    type=str,
+                    help='Write the full report as JSON to this path')
+    args = vars(ap.parse_args())
+
+    sessions = collect_labelled_sessions(args["input"])
+    if args["exercise_type"] is not None:
+        sessions = [session for session in sessions if session[1] == args["exercise_type"]]
+
+    report = sweep_thresholds(sessions, parse_range(args["down"]), parse_range(args["up"]), args["workers"])
+
+    for exercise_type, summary in report['exercises'].items():
+        current = summary['current']
+        if current['exact'] is None:
+            accuracy = "not in the grid"
+        else:
+            accuracy = f"exact {current['exact']:.0%}, mean error {current['mean_abs_error']:.2f}"
+        print(f"{exercise_type} ({summary['sessions']} sessions), current {current['down']:g}/{current['up']:g}: "
+              f"{accuracy}")
+        for config in summary['configurations'][:args["top"]]:
+            print(f"  down {config['down']:g} up {config['up']:g}: exact {config['exact']:.0%}, "
+                  f"mean error {config['mean_abs_error']:.2f}")
+    for failure in report['failed']:
+        print(f"  failed {failure['session']}: {failure['reason']}")
+
+    if args["report"] is not None:
+        with open(args["report"], 'w') as f:
+            json.dump(report, f, indent=2)
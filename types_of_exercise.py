@@ -2,6 +2,30 @@ import numpy as np
 from body_part_angle import BodyPartAngle
 from utils import *
 
+# (down, up) hysteresis thresholds: a rep is counted when the angle drops below `down`
+# and the next one can start once it rises above `up` again
+REP_THRESHOLDS = {
+    "push-up": (70, 160),
+    "squat": (70, 160),
+    "sit-up": (55, 105),
+}
+
+
+class RepState:
+    """Rep counter state; unpacks like the [counter, status] pair the counters return"""
+    __slots__ = ('counter', 'status')
+
+    def __init__(self, counter=0, status=True):
+        self.counter = counter  # movement of exercise
+        self.status = status  # state of move
+
+    def __iter__(self):
+        yield self.counter
+        yield self.status
+
+    def __repr__(self):
+        return f"RepState(counter={self.counter}, status={self.status})"
+
 
 class TypeOfExercise(BodyPartAngle):
     def __init__(self, landmarks):
@@ -11,16 +35,17 @@ class TypeOfExercise(BodyPartAngle):
         left_arm_angle = self.angle_of_the_left_arm()
         right_arm_angle = self.angle_of_the_left_arm()
         avg_arm_angle = (left_arm_angle + right_arm_angle) // 2
+        down, up = REP_THRESHOLDS["push-up"]
 
         if status:
-            if avg_arm_angle < 70:
+            if avg_arm_angle < down:
                 counter += 1
                 status = False
         else:
-            if avg_arm_angle > 160:
+            if avg_arm_angle > up:
                 status = True
 
-        return [counter, status]
+        return counter, status
 
     # def push_up_method_2():
 
@@ -39,22 +64,23 @@ class TypeOfExercise(BodyPartAngle):
             if nose[1] < avg_shoulder_y:
                 status = True
 
-        return [counter, status]
+        return counter, status
 
     def squat(self, counter, status):
         left_leg_angle = self.angle_of_the_right_leg()
         right_leg_angle = self.angle_of_the_left_leg()
         avg_leg_angle = (left_leg_angle + right_leg_angle) // 2
+        down, up = REP_THRESHOLDS["squat"]
 
         if status:
-            if avg_leg_angle < 70:
+            if avg_leg_angle < down:
                 counter += 1
                 status = False
         else:
-            if avg_leg_angle > 160:
+            if avg_leg_angle > up:
                 status = True
 
-        return [counter, status]
+        return counter, status
 
     def walk(self, counter, status):
         right_knee = detection_body_part(self.landmarks, "RIGHT_KNEE")
@@ -70,35 +96,45 @@ class TypeOfExercise(BodyPartAngle):
                 counter += 1
                 status = True
 
-        return [counter, status]
+        return counter, status
 
     def sit_up(self, counter, status):
         angle = self.angle_of_the_abdomen()
+        down, up = REP_THRESHOLDS["sit-up"]
         if status:
-            if angle < 55:
+            if angle < down:
                 counter += 1
                 status = False
         else:
-            if angle > 105:
+            if angle > up:
                 status = True
 
-        return [counter, status]
+        return counter, status
+
+    def steps(self, cadence, timestamp=None):
+        """Step count from a streaming CadenceEstimator; steadier than walk() on noisy knees"""
+        cadence.update(self.landmarks, timestamp)
+        return cadence.steps, cadence.side >= 0
 
     def calculate_exercise(self, exercise_type, counter, status):
         if exercise_type == "push-up":
-            counter, status = TypeOfExercise(self.landmarks).push_up(
-                counter, status)
+            counter, status = self.push_up(counter, status)
         elif exercise_type == "pull-up":
-            counter, status = TypeOfExercise(self.landmarks).pull_up(
-                counter, status)
+            counter, status = self.pull_up(counter, status)
         elif exercise_type == "squat":
-            counter, status = TypeOfExercise(self.landmarks).squat(
-                counter, status)
+            counter, status = self.squat(counter, status)
         elif exercise_type == "walk":
-            counter, status = TypeOfExercise(self.landmarks).walk(
-                counter, status)
+            counter, status = self.walk(counter, status)
         elif exercise_type == "sit-up":
-            counter, status = TypeOfExercise(self.landmarks).sit_up(
-                counter, status)
+            counter, status = self.sit_up(counter, status)
 
-        return [counter, status]
+        return counter, status
+
+    def update_state(self, exercise_type, state, cadence=None, timestamp=None):
+        """Advance a RepState in place instead of returning a new pair"""
+        if cadence is not None and exercise_type in ("walk", "run"):
+            state.counter, state.status = self.steps(cadence, timestamp)
+        else:
+            state.counter, state.status = self.calculate_exercise(
+                exercise_type, state.counter, state.status)
+        return state
@@ -32,6 +32,12 @@ def detection_body_part(landmarks, body_part_name):
     ]
 
 
+# return all landmarks as a (33, 4) array of x, y, z, visibility
+def landmarks_to_array(landmarks):
+    return np.array([[lm.x, lm.y, lm.z, lm.visibility] for lm in landmarks],
+                    dtype=np.float32)
+
+
 # return body_part, x, y as dataframe
 def detection_body_parts(landmarks):
     body_parts = pd.DataFrame(columns=["body_part", "x", "y"])
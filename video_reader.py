@@ -0,0 +1,189 @@
+# video_reader.py
+import queue
+import threading
+import time
+
+import cv2
+
+_END = None  # Queue sentinel: no more frames
+
+
+class PrefetchingVideoReader:
+    """cv2.VideoCapture stand-in for video files that decodes ahead on a background thread.
+
+    Frames are decoded into a bounded queue while the pipeline works on earlier ones.
+    Only [start, end) seconds of the file are read, seeking to start first, and only
+    every stride-th frame is decoded (the others are grabbed without decoding).
+    After each read(), last_timestamp holds the frame's position in the video in
+    seconds, which stays correct however fast or slow frames are processed.
+    """
+
+    def __init__(self, video_path: str, start: float = None, end: float = None, stride: int = 1,
+                 buffer_size: int = 32):
+        if stride < 1:
+            raise ValueError("stride must be at least 1")
+        self._cap = cv2.VideoCapture(video_path)
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.start = start or 0.0
+        self.end = end
+        self.stride = stride
+        self.last_timestamp = None
+        self.frames_read = 0
+
+        self._frames = queue.Queue(maxsize=buffer_size)
+        self._stopped = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._decode, name="video-prefetch", daemon=True)
+        if self._cap.isOpened():
+            self._thread.start()
+
+    def _decode(self):
+        cap = self._cap
+        frame_number = 0
+        if self.start > 0:
+            # Frame-based seeking is more reliable than CAP_PROP_POS_MSEC across backends
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(round(self.start * self.fps)))
+            frame_number = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        end_frame = None if self.end is None else int(round(self.end * self.fps))
+
+        try:
+            while not self._stopped.is_set():
+                if end_frame is not None and frame_number >= end_frame:
+                    break
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                timestamp = frame_number / self.fps
+                frame_number += 1
+                # Skipped frames only need demuxing, not decoding
+                for _ in range(self.stride - 1):
+                    if (end_frame is not None and frame_number >= end_frame) or not cap.grab():
+                        break
+                    frame_number += 1
+
+                while not self._stopped.is_set():
+                    try:
+                        self._frames.put((frame, timestamp), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        finally:
+            self._put_end()
+
+    def _put_end(self):
+        while not self._stopped.is_set():
+            try:
+                self._frames.put(_END, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened() and not self._finished
+
+    def read(self):
+        """Next (ret, frame); ret is False at the end of the selected range"""
+        if self._finished or not self._thread.is_alive() and self._frames.empty():
+            self._finished = True
+            return False, None
+        item = self._frames.get()
+        if item is _END:
+            self._finished = True
+            return False, None
+        frame, self.last_timestamp = item
+        self.frames_read += 1
+        return True, frame
+
+    def set(self, prop_id, value) -> bool:
+        return False  # Resolution is fixed by the file
+
+    def get(self, prop_id) -> float:
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps / self.stride  # Rate of the frames actually returned
+        return self._cap.get(prop_id)
+
+    def release(self):
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._cap.release()
+
+
+class SimulatedCamera:
+    """cv2.VideoCapture stand-in that plays a video file in real time like a webcam.
+
+    A background thread publishes frames at the file's native FPS. Like a real
+    camera, only the newest frame is kept: a frame that is replaced before the
+    pipeline reads it counts as dropped.
+    """
+
+    def __init__(self, video_path: str, fps: float = None):
+        self._cap = cv2.VideoCapture(video_path)
+        self.fps = fps or self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.last_frame_id = 0
+        self.last_capture_time = None  # perf_counter() when the frame returned by read() was captured
+
+        self._condition = threading.Condition()
+        self._latest = None  # (frame_id, frame, capture_time)
+        self._finished = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="simulated-camera", daemon=True)
+
+    def _run(self):
+        start = time.perf_counter()
+        frame_id = 0
+        while not self._stopped:
+            # Decode ahead, then wait for the frame's due time so decode cost isn't counted as latency
+            ret, frame = self._cap.read()
+            if not ret:
+                break
+            due = start + frame_id / self.fps
+            frame_id += 1
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self._condition:
+                if self._latest is not None and self._latest[0] > self.last_frame_id:
+                    self.frames_dropped += 1
+                self._latest = (frame_id, frame, time.perf_counter())
+                self.frames_captured += 1
+                self._condition.notify_all()
+
+        with self._condition:
+            self._finished = True
+            self._condition.notify_all()
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened() and not (self._finished and self._latest_consumed())
+
+    def _latest_consumed(self) -> bool:
+        return self._latest is None or self._latest[0] <= self.last_frame_id
+
+    def read(self):
+        """Block until a frame newer than the last one read is available"""
+        if not self._thread.is_alive() and not self._finished:
+            self._thread.start()
+        with self._condition:
+            while self._latest_consumed() and not self._finished:
+                self._condition.wait()
+            if self._latest_consumed():
+                return False, None
+            self.last_frame_id, frame, self.last_capture_time = self._latest
+            return True, frame
+
+    def set(self, prop_id, value) -> bool:
+        return False  # Resolution is fixed by the file
+
+    def get(self, prop_id) -> float:
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        return self._cap.get(prop_id)
+
+    def release(self):
+        self._stopped = True
+        if self._thread.is_alive():
+            self._thread.join()
+        self._cap.release()